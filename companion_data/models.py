@@ -5,6 +5,24 @@ from typing import List, Dict, Optional
 from pathlib import Path
 
 
+def gender_matches(companion_gender: str, gender_filter: str) -> bool:
+    """Check whether a companion's gender falls under a gender filter.
+
+    Unknown filters match every companion.
+    """
+    companion_gender = companion_gender.lower()
+    gender_filter = gender_filter.lower()
+    if gender_filter == "female":
+        return companion_gender == "female"
+    if gender_filter == "male":
+        return companion_gender == "male"
+    if gender_filter in ["non-binary", "nonbinary", "enby"]:
+        return companion_gender in ["non-binary", "genderfluid"]
+    if gender_filter == "transgender":
+        return "transgender" in companion_gender
+    return True
+
+
 @dataclass
 class Companion:
     """Represents an AI companion."""
@@ -354,14 +372,7 @@ class CompanionManager:
         filtered = self.get_all_companions()
 
         if gender:
-            if gender.lower() == "female":
-                filtered = [c for c in filtered if c["gender"].lower() == "female"]
-            elif gender.lower() == "male":
-                filtered = [c for c in filtered if c["gender"].lower() == "male"]
-            elif gender.lower() in ["non-binary", "nonbinary", "enby"]:
-                filtered = [c for c in filtered if c["gender"].lower() in ["non-binary", "genderfluid"]]
-            elif gender.lower() == "transgender":
-                filtered = [c for c in filtered if "transgender" in c["gender"].lower()]
+            filtered = [c for c in filtered if gender_matches(c["gender"], gender)]
 
         if personality_trait:
             trait = personality_trait.lower()
@@ -381,14 +392,7 @@ class CompanionManager:
         filtered = self.get_all_presets()
 
         if gender:
-            if gender.lower() == "female":
-                filtered = [c for c in filtered if c["gender"].lower() == "female"]
-            elif gender.lower() == "male":
-                filtered = [c for c in filtered if c["gender"].lower() == "male"]
-            elif gender.lower() in ["non-binary", "nonbinary", "enby"]:
-                filtered = [c for c in filtered if c["gender"].lower() in ["non-binary", "genderfluid"]]
-            elif gender.lower() == "transgender":
-                filtered = [c for c in filtered if "transgender" in c["gender"].lower()]
+            filtered = [c for c in filtered if gender_matches(c["gender"], gender)]
 
         if personality_trait:
             trait = personality_trait.lower()
@@ -9,9 +9,37 @@ A modern GTK4/libadwaita AI companion application with SMS integration,
 memory management, and multi-companion support.
 """
 import gi
+import os
+import re
+import shutil
+import subprocess
 import sys
 from pathlib import Path
 
+# Software GL rasterizers make GTK's GL renderer slower than plain cairo
+_SLOW_GL_RENDERERS = re.compile(r"llvmpipe|softpipe|swrast|software rasterizer", re.IGNORECASE)
+
+
+def _select_gsk_renderer():
+    """Fall back to the cairo renderer when GL is software-rendered.
+
+    Must run before GTK creates its first renderer. An explicit GSK_RENDERER
+    from the user is always respected.
+    """
+    if os.environ.get("GSK_RENDERER") or not shutil.which("glxinfo"):
+        return
+    try:
+        result = subprocess.run(
+            ["glxinfo", "-B"], capture_output=True, text=True, timeout=0.5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return
+    if _SLOW_GL_RENDERERS.search(result.stdout):
+        os.environ["GSK_RENDERER"] = "cairo"
+
+
+_select_gsk_renderer()
+
 # Require GTK4 and Adwaita before any imports
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
@@ -218,11 +246,19 @@ class KardiaApp(Adw.Application):
 
         self.ai_backend.generate_async(messages, system_prompt, on_response)
 
-    def get_companion_history(self):
-        """Get message history for current companion."""
-        if self.current_conversation:
-            return self.current_conversation.messages
-        return []
+    def get_companion_history(self, limit: int = None, before: int = None):
+        """Get message history for current companion.
+
+        Args:
+            limit: Return at most this many of the most recent messages
+            before: Only consider messages before this index in the history
+        """
+        if not self.current_conversation:
+            return []
+        messages = self.current_conversation.messages
+        end = len(messages) if before is None else before
+        start = 0 if limit is None else max(0, end - limit)
+        return messages[start:end]
 
 
 def main():
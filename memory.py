@@ -1,5 +1,6 @@
 """Long-term memory system for AI companions."""
 import json
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Optional
@@ -60,32 +61,45 @@ class MemoryStore:
         self.memory_file = data_dir / "memories.json"
         self._memories: List[Memory] = []
         self._index_by_key: Dict[str, Memory] = {}
+        # Bumped whenever memories are added, changed, removed or marked accessed
+        self._revision = 0
+        # Held while memories are changed or saved; UI workers and the chat
+        # thread both write to the store
+        self._lock = threading.RLock()
         self.load()
 
+    @property
+    def revision(self) -> int:
+        """Counter that changes whenever the stored memories change."""
+        return self._revision
+
     def load(self):
         """Load memories from disk."""
-        if self.memory_file.exists():
-            try:
-                with open(self.memory_file, "r") as f:
-                    data = json.load(f)
-                    self._memories = [Memory.from_dict(m) for m in data]
-                    self._rebuild_index()
-            except Exception as e:
-                print(f"Error loading memories: {e}")
+        with self._lock:
+            if self.memory_file.exists():
+                try:
+                    with open(self.memory_file, "r") as f:
+                        data = json.load(f)
+                        self._memories = [Memory.from_dict(m) for m in data]
+                        self._rebuild_index()
+                except Exception as e:
+                    print(f"Error loading memories: {e}")
+                    self._memories = []
+            else:
                 self._memories = []
-        else:
-            self._memories = []
-        self._rebuild_index()
+            self._rebuild_index()
+            self._revision += 1
 
     def save(self):
         """Save memories to disk."""
-        try:
-            self.memory_file.parent.mkdir(parents=True, exist_ok=True)
-            data = [m.to_dict() for m in self._memories]
-            with open(self.memory_file, "w") as f:
-                json.dump(data, f, indent=2)
-        except Exception as e:
-            print(f"Error saving memories: {e}")
+        with self._lock:
+            try:
+                self.memory_file.parent.mkdir(parents=True, exist_ok=True)
+                data = [m.to_dict() for m in self._memories]
+                with open(self.memory_file, "w") as f:
+                    json.dump(data, f, indent=2)
+            except Exception as e:
+                print(f"Error saving memories: {e}")
 
     def _rebuild_index(self):
         """Rebuild the key index."""
@@ -105,8 +119,53 @@ class MemoryStore:
         is_shared: bool = True,
     ) -> Memory:
         """Add a new memory."""
+        with self._lock:
+            memory = self._add_memory(
+                memory_type, content, key, value, importance, companion_id, is_shared
+            )
+            self.save()
+            return memory
+
+    def add_memories_bulk(self, rows: List[Dict]) -> List[Memory]:
+        """Add several memories, saving to disk once.
+
+        Args:
+            rows: Dicts of add_memory keyword arguments
+
+        Returns:
+            The added (or updated) memories, in order
+        """
+        with self._lock:
+            memories = [self._add_memory(**row) for row in rows]
+            if memories:
+                self.save()
+            return memories
+
+    def _add_memory(
+        self,
+        memory_type: str,
+        content: str,
+        key: Optional[str] = None,
+        value: Optional[str] = None,
+        importance: int = 1,
+        companion_id: str = "",
+        is_shared: bool = True,
+    ) -> Memory:
+        """Add or update a memory in memory without saving."""
         import uuid
 
+        now = datetime.now().isoformat()
+
+        # If memory with same key exists, update it
+        if key and key in self._index_by_key:
+            existing = self._index_by_key[key]
+            existing.value = value
+            existing.content = content
+            existing.importance = max(existing.importance, importance)
+            existing.last_accessed = now
+            self._revision += 1
+            return existing
+
         memory = Memory(
             id=str(uuid.uuid4()),
             memory_type=memory_type,
@@ -114,64 +173,65 @@ class MemoryStore:
             key=key,
             value=value,
             importance=importance,
-            created_at=datetime.now().isoformat(),
-            last_accessed=datetime.now().isoformat(),
+            created_at=now,
+            last_accessed=now,
             companion_id=companion_id,
             is_shared=is_shared,
         )
-
-        # If memory with same key exists, update it
-        if key and key in self._index_by_key:
-            existing = self._index_by_key[key]
-            existing.value = value
-            existing.content = content
-            existing.importance = max(existing.importance, importance)
-            existing.last_accessed = datetime.now().isoformat()
-            self.save()
-            return existing
-
         self._memories.append(memory)
         if key:
             self._index_by_key[key] = memory
-        self.save()
+        self._revision += 1
 
         return memory
 
     def get_memory_by_key(self, key: str) -> Optional[Memory]:
         """Get memory by key."""
-        memory = self._index_by_key.get(key)
-        if memory:
-            memory.touch()
-            self.save()
-        return memory
+        with self._lock:
+            memory = self._index_by_key.get(key)
+            if memory:
+                memory.touch()
+                self._revision += 1
+                self.save()
+            return memory
+
+    def get_memories_by_keys(self, keys: List[str]) -> Dict[str, Memory]:
+        """Get memories for several keys at once, without marking them accessed."""
+        return {key: self._index_by_key[key] for key in keys if key in self._index_by_key}
 
     def get_memories_by_type(self, memory_type: str) -> List[Memory]:
         """Get all memories of a specific type."""
-        memories = [m for m in self._memories if m.memory_type == memory_type]
-        for m in memories:
-            m.touch()
-        self.save()
-        return memories
+        with self._lock:
+            memories = [m for m in self._memories if m.memory_type == memory_type]
+            for m in memories:
+                m.touch()
+            self._revision += 1
+            self.save()
+            return memories
 
     def get_important_memories(self, min_importance: int = 3) -> List[Memory]:
         """Get memories above importance threshold."""
-        memories = [m for m in self._memories if m.importance >= min_importance]
-        for m in memories:
-            m.touch()
-        self.save()
-        return sorted(memories, key=lambda m: m.importance, reverse=True)
+        with self._lock:
+            memories = [m for m in self._memories if m.importance >= min_importance]
+            for m in memories:
+                m.touch()
+            self._revision += 1
+            self.save()
+            return sorted(memories, key=lambda m: m.importance, reverse=True)
 
     def get_recent_memories(self, limit: int = 20) -> List[Memory]:
         """Get recently accessed memories."""
-        memories = sorted(
-            self._memories,
-            key=lambda m: m.last_accessed,
-            reverse=True,
-        )[:limit]
-        for m in memories:
-            m.touch()
-        self.save()
-        return memories
+        with self._lock:
+            memories = sorted(
+                self._memories,
+                key=lambda m: m.last_accessed,
+                reverse=True,
+            )[:limit]
+            for m in memories:
+                m.touch()
+            self._revision += 1
+            self.save()
+            return memories
 
     def get_all_memories(self) -> List[Memory]:
         """Get all memories."""
@@ -193,23 +253,41 @@ class MemoryStore:
 
     def delete_memory(self, memory_id: str) -> bool:
         """Delete a memory by ID."""
-        for i, memory in enumerate(self._memories):
-            if memory.id == memory_id:
-                if memory.key:
-                    self._index_by_key.pop(memory.key, None)
-                self._memories.pop(i)
-                self.save()
-                return True
-        return False
+        with self._lock:
+            for i, memory in enumerate(self._memories):
+                if memory.id == memory_id:
+                    if memory.key:
+                        self._index_by_key.pop(memory.key, None)
+                    self._memories.pop(i)
+                    self._revision += 1
+                    self.save()
+                    return True
+            return False
+
+    def clear_all(self) -> int:
+        """Delete every memory, saving to disk once.
+
+        Returns:
+            Number of memories removed
+        """
+        with self._lock:
+            count = len(self._memories)
+            self._memories = []
+            self._index_by_key = {}
+            self._revision += 1
+            self.save()
+            return count
 
     def update_memory_importance(self, memory_id: str, importance: int) -> bool:
         """Update memory importance."""
-        for memory in self._memories:
-            if memory.id == memory_id:
-                memory.importance = max(1, min(5, importance))
-                self.save()
-                return True
-        return False
+        with self._lock:
+            for memory in self._memories:
+                if memory.id == memory_id:
+                    memory.importance = max(1, min(5, importance))
+                    self._revision += 1
+                    self.save()
+                    return True
+            return False
 
     def get_memories_for_context(self, max_count: int = 15) -> List[Memory]:
         """Get memories formatted for AI context."""
@@ -267,6 +345,7 @@ class MemoryStore:
         """Get memory statistics."""
         return {
             "total_memories": len(self._memories),
+            "shared_count": sum(1 for m in self._memories if m.is_shared),
             "by_type": {
                 mt.value: len([m for m in self._memories if m.memory_type == mt.value])
                 for mt in MemoryType
@@ -294,94 +373,95 @@ class MemoryStore:
         Returns:
             Dict with success status and info
         """
-        try:
-            export_file = Path(export_path)
-
-            if format == "json":
-                # Export as JSON
-                data = {
-                    "version": "1.0",
-                    "export_date": datetime.now().isoformat(),
-                    "total_memories": len(self._memories),
-                    "memories": [m.to_dict() for m in self._memories],
-                }
-
-                with open(export_file, "w") as f:
-                    json.dump(data, f, indent=2)
-
-                return {
-                    "success": True,
-                    "format": "json",
-                    "count": len(self._memories),
-                    "path": str(export_file),
-                }
-
-            elif format == "txt":
-                # Export as readable text
-                with open(export_file, "w") as f:
-                    f.write("=" * 60 + "\n")
-                    f.write("AI Companion Memory Export\n")
-                    f.write("=" * 60 + "\n")
-                    f.write(f"Export Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                    f.write(f"Total Memories: {len(self._memories)}\n")
-                    f.write("=" * 60 + "\n\n")
-
-                    # Group by type
-                    by_type = {}
-                    for memory in self._memories:
-                        if memory.memory_type not in by_type:
-                            by_type[memory.memory_type] = []
-                        by_type[memory.memory_type].append(memory)
-
-                    type_labels = {
-                        "personal_info": "Personal Information",
-                        "preference": "Preferences",
-                        "life_event": "Life Events",
-                        "emotional_state": "Emotional States",
-                        "interest": "Interests",
-                        "relationship": "Relationships",
-                        "goal": "Goals",
-                        "important_fact": "Important Facts",
+        with self._lock:
+            try:
+                export_file = Path(export_path)
+
+                if format == "json":
+                    # Export as JSON
+                    data = {
+                        "version": "1.0",
+                        "export_date": datetime.now().isoformat(),
+                        "total_memories": len(self._memories),
+                        "memories": [m.to_dict() for m in self._memories],
                     }
 
-                    for memory_type, memories in sorted(by_type.items()):
-                        label = type_labels.get(memory_type, memory_type.replace("_", " ").title())
-                        f.write(f"\n{label}\n")
-                        f.write("-" * 40 + "\n")
-
-                        for memory in sorted(memories, key=lambda m: m.importance, reverse=True):
-                            stars = "★" * memory.importance + "☆" * (5 - memory.importance)
-                            f.write(f"\n[{stars}] {memory.content}\n")
-
-                            if memory.key and memory.value:
-                                f.write(f"  Key: {memory.key} = {memory.value}\n")
-
-                            f.write(f"  Created: {memory.created_at[:10]}\n")
+                    with open(export_file, "w") as f:
+                        json.dump(data, f, indent=2)
 
-                            if not memory.is_shared:
-                                f.write(f"  Companion-specific: {memory.companion_id}\n")
+                    return {
+                        "success": True,
+                        "format": "json",
+                        "count": len(self._memories),
+                        "path": str(export_file),
+                    }
 
-                    f.write("\n" + "=" * 60 + "\n")
+                elif format == "txt":
+                    # Export as readable text
+                    with open(export_file, "w") as f:
+                        f.write("=" * 60 + "\n")
+                        f.write("AI Companion Memory Export\n")
+                        f.write("=" * 60 + "\n")
+                        f.write(f"Export Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+                        f.write(f"Total Memories: {len(self._memories)}\n")
+                        f.write("=" * 60 + "\n\n")
+
+                        # Group by type
+                        by_type = {}
+                        for memory in self._memories:
+                            if memory.memory_type not in by_type:
+                                by_type[memory.memory_type] = []
+                            by_type[memory.memory_type].append(memory)
+
+                        type_labels = {
+                            "personal_info": "Personal Information",
+                            "preference": "Preferences",
+                            "life_event": "Life Events",
+                            "emotional_state": "Emotional States",
+                            "interest": "Interests",
+                            "relationship": "Relationships",
+                            "goal": "Goals",
+                            "important_fact": "Important Facts",
+                        }
+
+                        for memory_type, memories in sorted(by_type.items()):
+                            label = type_labels.get(memory_type, memory_type.replace("_", " ").title())
+                            f.write(f"\n{label}\n")
+                            f.write("-" * 40 + "\n")
+
+                            for memory in sorted(memories, key=lambda m: m.importance, reverse=True):
+                                stars = "★" * memory.importance + "☆" * (5 - memory.importance)
+                                f.write(f"\n[{stars}] {memory.content}\n")
+
+                                if memory.key and memory.value:
+                                    f.write(f"  Key: {memory.key} = {memory.value}\n")
+
+                                f.write(f"  Created: {memory.created_at[:10]}\n")
+
+                                if not memory.is_shared:
+                                    f.write(f"  Companion-specific: {memory.companion_id}\n")
+
+                        f.write("\n" + "=" * 60 + "\n")
+
+                    return {
+                        "success": True,
+                        "format": "txt",
+                        "count": len(self._memories),
+                        "path": str(export_file),
+                    }
 
-                return {
-                    "success": True,
-                    "format": "txt",
-                    "count": len(self._memories),
-                    "path": str(export_file),
-                }
+                else:
+                    return {
+                        "success": False,
+                        "error": f"Unknown format: {format}",
+                    }
 
-            else:
+            except Exception as e:
                 return {
                     "success": False,
-                    "error": f"Unknown format: {format}",
+                    "error": str(e),
                 }
 
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-            }
-
     def import_memories(
         self,
         import_path: str,
@@ -397,100 +477,106 @@ class MemoryStore:
         Returns:
             Dict with success status and info
         """
-        try:
-            import_file = Path(import_path)
-
-            if not import_file.exists():
-                return {
-                    "success": False,
-                    "error": "File not found",
-                }
+        with self._lock:
+            try:
+                import_file = Path(import_path)
 
-            with open(import_file, "r") as f:
-                data = json.load(f)
-
-            # Check if this is an export file with metadata
-            if isinstance(data, dict) and "memories" in data:
-                memories_data = data["memories"]
-                source_version = data.get("version", "unknown")
-                source_date = data.get("export_date", "unknown")
-            elif isinstance(data, list):
-                # Direct list of memories
-                memories_data = data
-                source_version = "unknown"
-                source_date = "unknown"
-            else:
-                return {
-                    "success": False,
-                    "error": "Invalid import file format",
-                }
+                if not import_file.exists():
+                    return {
+                        "success": False,
+                        "error": "File not found",
+                    }
 
-            if not merge:
-                # Replace all memories
-                self._memories = []
-                self._index_by_key = {}
+                with open(import_file, "r") as f:
+                    data = json.load(f)
 
-            added_count = 0
-            updated_count = 0
-            skipped_count = 0
+                # Check if this is an export file with metadata
+                if isinstance(data, dict) and "memories" in data:
+                    memories_data = data["memories"]
+                    source_version = data.get("version", "unknown")
+                    source_date = data.get("export_date", "unknown")
+                elif isinstance(data, list):
+                    # Direct list of memories
+                    memories_data = data
+                    source_version = "unknown"
+                    source_date = "unknown"
+                else:
+                    return {
+                        "success": False,
+                        "error": "Invalid import file format",
+                    }
 
-            for mem_data in memories_data:
-                try:
-                    # Handle old exports without is_shared field
-                    if "is_shared" not in mem_data:
-                        mem_data["is_shared"] = True
-
-                    memory = Memory.from_dict(mem_data)
-
-                    # Check for duplicate by key
-                    if memory.key and memory.key in self._index_by_key:
-                        if merge:
-                            # Update existing
-                            existing = self._index_by_key[memory.key]
-                            existing.value = memory.value
-                            existing.content = memory.content
-                            existing.importance = max(existing.importance, memory.importance)
-                            updated_count += 1
+                if not merge:
+                    # Replace all memories
+                    self._memories = []
+                    self._index_by_key = {}
+
+                added_count = 0
+                updated_count = 0
+                skipped_count = 0
+
+                # Consume the parsed list as we go so each dict can be freed once it
+                # has become a Memory, instead of holding both copies until the end
+                memories_data.reverse()
+                while memories_data:
+                    mem_data = memories_data.pop()
+                    try:
+                        # Handle old exports without is_shared field
+                        if "is_shared" not in mem_data:
+                            mem_data["is_shared"] = True
+
+                        memory = Memory.from_dict(mem_data)
+
+                        # Check for duplicate by key
+                        if memory.key and memory.key in self._index_by_key:
+                            if merge:
+                                # Update existing
+                                existing = self._index_by_key[memory.key]
+                                existing.value = memory.value
+                                existing.content = memory.content
+                                existing.importance = max(existing.importance, memory.importance)
+                                updated_count += 1
+                            else:
+                                # In replace mode, still track as added
+                                self._memories.append(memory)
+                                if memory.key:
+                                    self._index_by_key[memory.key] = memory
+                                added_count += 1
                         else:
-                            # In replace mode, still track as added
+                            # Add new memory
                             self._memories.append(memory)
                             if memory.key:
                                 self._index_by_key[memory.key] = memory
                             added_count += 1
-                    else:
-                        # Add new memory
-                        self._memories.append(memory)
-                        if memory.key:
-                            self._index_by_key[memory.key] = memory
-                        added_count += 1
 
-                except Exception as e:
-                    print(f"Error importing memory: {e}")
-                    skipped_count += 1
-                    continue
+                    except Exception as e:
+                        print(f"Error importing memory: {e}")
+                        skipped_count += 1
+                        continue
 
-            self.save()
+                self._revision += 1
+                self.save()
+
+                return {
+                    "success": True,
+                    "added": added_count,
+                    "updated": updated_count,
+                    "skipped": skipped_count,
+                    "total": added_count + updated_count,
+                    "source_version": source_version,
+                    "source_date": source_date,
+                }
 
-            return {
-                "success": True,
-                "added": added_count,
-                "updated": updated_count,
-                "skipped": skipped_count,
-                "total": added_count + updated_count,
-                "source_version": source_version,
-                "source_date": source_date,
-            }
-
-        except json.JSONDecodeError as e:
-            return {
-                "success": False,
-                "error": f"Invalid JSON: {str(e)}",
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-            }
+            except json.JSONDecodeError as e:
+                return {
+                    "success": False,
+                    "error": f"Invalid JSON: {str(e)}",
+                }
+            except Exception as e:
+                return {
+                    "success": False,
+                    "error": str(e),
+                }
 
     def get_shared_memories(self) -> List[Memory]:
         """Get memories that are shared across all companions."""
@@ -164,6 +164,11 @@ class ConfigManager:
         self._config[key] = value
         self.save()
 
+    def update(self, values: dict):
+        """Set several config values, saving once."""
+        self._config.update(values)
+        self.save()
+
     def _get_default_config(self) -> dict:
         """Get default configuration."""
         return {
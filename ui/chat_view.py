@@ -7,23 +7,164 @@ All rights reserved.
 Part of the Kardia AI Companion application.
 """
 import gi
+import itertools
 from datetime import datetime
 
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
-from gi.repository import Gtk, Adw, Gdk, GLib, Pango, GdkPixbuf
+from gi.repository import Gtk, Adw, Gdk, GLib, Gio, GObject, Pango, GdkPixbuf
 
 from companion_data.models import Message
 
 
+def _format_timestamp(timestamp: str) -> str:
+    """Format a timestamp string for display."""
+    try:
+        # Parse ISO format timestamp
+        dt = datetime.fromisoformat(timestamp)
+
+        # Get current time for comparison
+        now = datetime.now()
+
+        # Format based on how recent the message is
+        if dt.date() == now.date():
+            # Today - show time only
+            return dt.strftime("%I:%M %p").lstrip("0")
+        elif (now - dt).days < 7:
+            # This week - show day and time
+            return dt.strftime("%a at %I:%M %p").lstrip("0")
+        else:
+            # Older - show date and time
+            return dt.strftime("%b %d, %Y at %I:%M %p").lstrip("0")
+    except Exception:
+        # If parsing fails, return as-is
+        return timestamp
+
+
+class MessageItem(GObject.Object):
+    """List model item holding one chat message."""
+
+    __gtype_name__ = "MessageItem"
+
+    role = GObject.Property(type=str, default="")
+    content = GObject.Property(type=str, default="")
+    timestamp = GObject.Property(type=str, default="")
+
+    def __init__(self, role: str, content: str, timestamp: str = None):
+        """Create an item for a message."""
+        super().__init__(role=role, content=content, timestamp=timestamp or "")
+
+
+class MessageRow(Gtk.Box):
+    """Recyclable row widget showing a user or companion message bubble."""
+
+    def __init__(self):
+        """Create the row; content is filled in by bind()."""
+        super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=2)
+        self.set_hexpand(True)
+
+        self.timestamp_label = Gtk.Label()
+        self.timestamp_label.add_css_class("message-timestamp")
+        self.append(self.timestamp_label)
+
+        # Horizontal container for avatar and message bubble
+        main_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
+        main_box.set_margin_start(10)
+        main_box.set_margin_end(10)
+
+        # Avatar, shown for companion messages only
+        self.avatar_image = Gtk.Image()
+        self.avatar_image.set_pixel_size(32)
+        self.avatar_image.set_valign(Gtk.Align.START)
+        main_box.append(self.avatar_image)
+
+        self.avatar_label = Gtk.Label()
+        self.avatar_label.add_css_class("avatar-small")
+        self.avatar_label.set_valign(Gtk.Align.START)
+        main_box.append(self.avatar_label)
+
+        # Message bubble; halign puts it on the sender's side
+        self.frame = Gtk.Frame()
+        self.frame.add_css_class("message-bubble")
+        self.frame.set_valign(Gtk.Align.START)
+        self.frame.set_hexpand(True)
+
+        self.label = Gtk.Label()
+        self.label.set_wrap(True)
+        self.label.set_wrap_mode(Pango.WrapMode.WORD_CHAR)
+        self.label.set_max_width_chars(60)
+        self.label.set_xalign(0)
+        self.frame.set_child(self.label)
+        main_box.append(self.frame)
+
+        self.append(main_box)
+
+    def bind(self, item: MessageItem, avatar_texture, avatar_initial: str):
+        """Show a message in this row."""
+        is_user = item.role == "user"
+
+        if item.timestamp:
+            self.timestamp_label.set_label(_format_timestamp(item.timestamp))
+            self.timestamp_label.set_visible(True)
+            if is_user:
+                self.timestamp_label.set_halign(Gtk.Align.END)
+                self.timestamp_label.set_margin_start(0)
+                self.timestamp_label.set_margin_end(15)
+            else:
+                # Line up with the bubble, past the avatar and its spacing
+                self.timestamp_label.set_halign(Gtk.Align.START)
+                self.timestamp_label.set_margin_start(52)
+                self.timestamp_label.set_margin_end(0)
+        else:
+            self.timestamp_label.set_visible(False)
+
+        if is_user:
+            self.avatar_image.set_visible(False)
+            self.avatar_label.set_visible(False)
+        elif avatar_texture:
+            self.avatar_image.set_from_paintable(avatar_texture)
+            self.avatar_image.set_visible(True)
+            self.avatar_label.set_visible(False)
+        else:
+            self.avatar_label.set_label(avatar_initial)
+            self.avatar_label.set_visible(True)
+            self.avatar_image.set_visible(False)
+
+        self.frame.set_halign(Gtk.Align.END if is_user else Gtk.Align.START)
+        if is_user:
+            self.frame.remove_css_class("companion-message")
+            self.frame.add_css_class("user-message")
+        else:
+            self.frame.remove_css_class("user-message")
+            self.frame.add_css_class("companion-message")
+
+        self.label.set_label(item.content)
+
+    def unbind(self):
+        """Drop the row's reference to the avatar before it is recycled."""
+        self.avatar_image.clear()
+
+
 class ChatView(Gtk.Box):
     """Chat view widget (GTK4)."""
 
+    # Messages added per idle iteration when loading history
+    LOAD_CHUNK_SIZE = 20
+    # Messages fetched per page of history; older pages load on scroll-up
+    HISTORY_PAGE_SIZE = 200
+
     def __init__(self, main_window):
         """Initialize chat view."""
         super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=0)
         self.main_window = main_window
         self.companion = None
+        self._avatar_texture = None
+
+        # Identifies the current history load; replaced to cancel a stale one
+        self._history_token = None
+        self._pending_history = None
+        # Index in the conversation of the oldest message shown
+        self._history_start = 0
 
         self._create_ui()
 
@@ -70,11 +211,19 @@ class ChatView(Gtk.Box):
         messages_scroll = Gtk.ScrolledWindow()
         messages_scroll.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.AUTOMATIC)
         messages_scroll.set_vexpand(True)
+        messages_scroll.connect("edge-reached", self._on_edge_reached)
+
+        # Messages list; rows are recycled, so only visible messages have widgets
+        self.message_store = Gio.ListStore.new(MessageItem)
 
-        # Messages list box
-        self.messages_list = Gtk.ListBox()
-        self.messages_list.set_selection_mode(Gtk.SelectionMode.NONE)
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self._on_row_setup)
+        factory.connect("bind", self._on_row_bind)
+        factory.connect("unbind", self._on_row_unbind)
+
+        self.messages_list = Gtk.ListView.new(Gtk.NoSelection.new(self.message_store), factory)
         messages_scroll.set_child(self.messages_list)
+        self.messages_scroll = messages_scroll
 
         # Message entry area
         entry_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
@@ -112,32 +261,84 @@ class ChatView(Gtk.Box):
         name_markup = f"<b>{companion.display_name}</b> - {companion.gender}"
         self.info_label.set_markup(name_markup)
 
-    def load_messages(self, messages):
-        """Load conversation messages."""
-        # Clear existing
-        child = self.messages_list.get_first_child()
-        while child:
-            next_child = child.get_next_sibling()
-            self.messages_list.remove(child)
-            child = next_child
-
-        # Add messages
-        for msg in messages:
-            timestamp = msg.timestamp if hasattr(msg, 'timestamp') else None
-            if msg.role == "user":
-                self._add_user_message(msg.content, timestamp)
-            else:
-                self._add_companion_message(msg.content, timestamp)
+        # Every companion row shares one avatar texture
+        self._avatar_texture = self._load_avatar_texture()
+
+    def _clear_messages(self):
+        """Remove all message rows and cancel any history still loading."""
+        self._history_token = None
+        self._pending_history = None
+        self._history_start = 0
+        self.message_store.remove_all()
+
+    @staticmethod
+    def _message_item(msg) -> MessageItem:
+        """Create a list item for a stored message."""
+        timestamp = msg.timestamp if hasattr(msg, 'timestamp') else None
+        return MessageItem(msg.role, msg.content, timestamp)
+
+    def load_messages_async(self, messages, chunk_size: int = None):
+        """Load conversation messages a chunk at a time from idle callbacks.
+
+        The view stays responsive while a long history is added. The messages
+        are taken to be the most recent ones, so older pages load on scroll-up.
+        """
+        self._clear_messages()
+        conversation = self.main_window.app.current_conversation
+        self._history_start = (len(conversation.messages) if conversation else 0) - len(messages)
+        self._history_token = token = object()
+        # Snapshot: the conversation list keeps growing while this loads
+        self._pending_history = pending = iter(list(messages))
+        GLib.idle_add(
+            self._load_history_chunk, token, pending, chunk_size or self.LOAD_CHUNK_SIZE,
+            priority=GLib.PRIORITY_DEFAULT_IDLE
+        )
+
+    def _load_history_chunk(self, token, pending, chunk_size) -> bool:
+        """Add the next chunk of history; returns whether more remain."""
+        if token is not self._history_token:
+            return GLib.SOURCE_REMOVE
+
+        items = [self._message_item(msg) for msg in itertools.islice(pending, chunk_size)]
+        self.message_store.splice(self.message_store.get_n_items(), 0, items)
+
+        if len(items) < chunk_size:
+            self._history_token = None
+            self._pending_history = None
+            self._scroll_to_bottom()
+            return GLib.SOURCE_REMOVE
+        return GLib.SOURCE_CONTINUE
+
+    def _finish_history(self):
+        """Add any history still loading, so new messages land after it."""
+        pending = self._pending_history
+        if pending is None:
+            return
+        self._history_token = None
+        self._pending_history = None
+        items = [self._message_item(msg) for msg in pending]
+        self.message_store.splice(self.message_store.get_n_items(), 0, items)
+
+    def _on_edge_reached(self, scroll, position):
+        """Load the previous page of history when scrolled to the top."""
+        if position != Gtk.PositionType.TOP or self._history_start <= 0:
+            return
+        if self._pending_history is not None:
+            return
 
-        # Scroll to bottom
-        GLib.idle_add(self._scroll_to_bottom)
+        older = self.main_window.app.get_companion_history(
+            limit=self.HISTORY_PAGE_SIZE, before=self._history_start
+        )
+        self._history_start -= len(older)
+        self.message_store.splice(0, 0, [self._message_item(msg) for msg in older])
 
     def show_user_message(self, content: str, timestamp: str = None):
         """Display a user message."""
         from datetime import datetime
         if not timestamp:
             timestamp = datetime.now().isoformat()
-        self._add_user_message(content, timestamp)
+        self._finish_history()
+        self.message_store.append(MessageItem("user", content, timestamp))
         GLib.idle_add(self._scroll_to_bottom)
 
     def show_companion_message(self, content: str, timestamp: str = None):
@@ -145,183 +346,40 @@ class ChatView(Gtk.Box):
         from datetime import datetime
         if not timestamp:
             timestamp = datetime.now().isoformat()
-        self._add_companion_message(content, timestamp)
+        self._finish_history()
+        self.message_store.append(MessageItem("assistant", content, timestamp))
         GLib.idle_add(self._scroll_to_bottom)
 
-    def _add_user_message(self, content: str, timestamp: str = None):
-        """Add a user message to the chat."""
-        row = Gtk.ListBoxRow()
-        row.set_selectable(False)
-
-        # Main container - vertical for timestamp + message
-        vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
-        vbox.set_hexpand(True)
-
-        # Timestamp row (right-aligned)
-        if timestamp:
-            timestamp_label = Gtk.Label(label=self._format_timestamp(timestamp))
-            timestamp_label.add_css_class("message-timestamp")
-            timestamp_label.set_halign(Gtk.Align.END)
-            timestamp_label.set_margin_end(15)
-            vbox.append(timestamp_label)
-
-        # Horizontal container for message
-        main_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=0)
-        main_box.set_hexpand(True)
-
-        # Spacer to push message to the right
-        spacer = Gtk.Box()
-        spacer.set_hexpand(True)
-        main_box.append(spacer)
-
-        # Message bubble
-        frame = Gtk.Frame()
-        frame.add_css_class("user-message")
-        frame.add_css_class("message-bubble")
-        frame.set_valign(Gtk.Align.START)
-
-        label = Gtk.Label(label=content)
-        label.set_wrap(True)
-        label.set_wrap_mode(Pango.WrapMode.WORD_CHAR)
-        label.set_max_width_chars(60)
-        label.set_xalign(0)
-
-        frame.set_child(label)
-        main_box.append(frame)
-
-        # Right margin
-        margin = Gtk.Box()
-        margin.set_size_request(10, 0)
-        main_box.append(margin)
-
-        vbox.append(main_box)
-        row.set_child(vbox)
-        self.messages_list.append(row)
-
-    def _add_companion_message(self, content: str, timestamp: str = None):
-        """Add a companion message to the chat."""
-        row = Gtk.ListBoxRow()
-        row.set_selectable(False)
-
-        # Main container - vertical for timestamp + message
-        vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
-        vbox.set_hexpand(True)
-
-        # Timestamp row (left-aligned with avatar)
-        if timestamp:
-            timestamp_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=0)
-            timestamp_box.set_hexpand(True)
-
-            # Left margin
-            margin = Gtk.Box()
-            margin.set_size_request(52, 0)  # Match avatar + spacing
-            timestamp_box.append(margin)
-
-            timestamp_label = Gtk.Label(label=self._format_timestamp(timestamp))
-            timestamp_label.add_css_class("message-timestamp")
-            timestamp_label.set_halign(Gtk.Align.START)
-            timestamp_box.append(timestamp_label)
-
-            # Spacer
-            spacer = Gtk.Box()
-            spacer.set_hexpand(True)
-            timestamp_box.append(spacer)
-
-            vbox.append(timestamp_box)
-
-        # Horizontal container for message
-        main_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=0)
-        main_box.set_hexpand(True)
-
-        # Left margin
-        margin = Gtk.Box()
-        margin.set_size_request(10, 0)
-        main_box.append(margin)
-
-        # Avatar
-        avatar = self._create_companion_avatar()
-        avatar.set_valign(Gtk.Align.START)
-        main_box.append(avatar)
-
-        # Spacing between avatar and message
-        spacing = Gtk.Box()
-        spacing.set_size_request(10, 0)
-        main_box.append(spacing)
-
-        # Message bubble
-        frame = Gtk.Frame()
-        frame.add_css_class("companion-message")
-        frame.add_css_class("message-bubble")
-        frame.set_valign(Gtk.Align.START)
-
-        label = Gtk.Label(label=content)
-        label.set_wrap(True)
-        label.set_wrap_mode(Pango.WrapMode.WORD_CHAR)
-        label.set_max_width_chars(60)
-        label.set_xalign(0)
-
-        frame.set_child(label)
-        main_box.append(frame)
-
-        # Spacer to push remaining content to the right
-        spacer = Gtk.Box()
-        spacer.set_hexpand(True)
-        main_box.append(spacer)
-
-        vbox.append(main_box)
-        row.set_child(vbox)
-        self.messages_list.append(row)
-
-    def _create_companion_avatar(self) -> Gtk.Widget:
-        """Create an avatar for the companion, using image if available."""
-        # Check if companion has an image
+    def _load_avatar_texture(self):
+        """Load the companion's avatar image, or None to use a text avatar."""
         if self.companion and self.companion.image_path:
             try:
                 pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_size(
                     self.companion.image_path, 32, 32
                 )
-                texture = Gdk.Texture.new_for_pixbuf(pixbuf)
-                image = Gtk.Image()
-                image.set_from_paintable(texture)
-                image.set_size_request(32, 32)
-                return image
+                return Gdk.Texture.new_for_pixbuf(pixbuf)
             except Exception as e:
                 print(f"Error loading companion image: {e}")
+        return None
 
-        # Fall back to text avatar
-        avatar = Gtk.Label()
-        avatar.set_label(self.companion.display_name[0] if self.companion else "?")
-        avatar.add_css_class("avatar-small")
-        return avatar
+    def _on_row_setup(self, factory, list_item):
+        """Create a row widget that will be reused for many messages."""
+        list_item.set_activatable(False)
+        list_item.set_selectable(False)
+        list_item.set_child(MessageRow())
 
-    def _format_timestamp(self, timestamp: str) -> str:
-        """Format a timestamp string for display."""
-        from datetime import datetime
-
-        try:
-            # Parse ISO format timestamp
-            dt = datetime.fromisoformat(timestamp)
+    def _on_row_bind(self, factory, list_item):
+        """Show the list item's message in its row."""
+        initial = self.companion.display_name[0] if self.companion else "?"
+        list_item.get_child().bind(list_item.get_item(), self._avatar_texture, initial)
 
-            # Get current time for comparison
-            now = datetime.now()
-
-            # Format based on how recent the message is
-            if dt.date() == now.date():
-                # Today - show time only
-                return dt.strftime("%I:%M %p").lstrip("0")
-            elif (now - dt).days < 7:
-                # This week - show day and time
-                return dt.strftime("%a at %I:%M %p").lstrip("0")
-            else:
-                # Older - show date and time
-                return dt.strftime("%b %d, %Y at %I:%M %p").lstrip("0")
-        except Exception:
-            # If parsing fails, return as-is
-            return timestamp
+    def _on_row_unbind(self, factory, list_item):
+        """Clear a row before it is recycled."""
+        list_item.get_child().unbind()
 
     def _scroll_to_bottom(self):
         """Scroll messages view to bottom."""
-        adj = self.messages_list.get_adjustment()
+        adj = self.messages_scroll.get_vadjustment()
         adj.set_value(adj.get_upper() - adj.get_page_size())
 
     def _on_send_message(self, widget):
@@ -392,11 +450,7 @@ class ChatView(Gtk.Box):
             self.main_window.app.set_current_companion(self.main_window.app.current_companion)
 
         # Clear messages from view
-        child = self.messages_list.get_first_child()
-        while child:
-            next_child = child.get_next_sibling()
-            self.messages_list.remove(child)
-            child = next_child
+        self._clear_messages()
 
         # Show toast notification
         toast = Adw.Toast(title="Chat deleted - Starting fresh")
@@ -6,17 +6,102 @@ All rights reserved.
 
 Part of the Kardia AI Companion application.
 """
+import functools
 import gi
-import uuid
+import os
+import re
+import threading
 from pathlib import Path
 
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
-from gi.repository import Gtk, Adw, GdkPixbuf, Gdk
-
-
+from gi.repository import Gtk, Adw, GdkPixbuf, Gdk, Gio, GLib
+
+# Separator for the comma-separated interests field
+_INTEREST_SEP = re.compile(r"\s*,\s*")
+
+# Combo row options
+GENDER_OPTIONS = ("Female", "Male", "Non-Binary", "Genderfluid", "Transgender Woman",
+                  "Transgender Man", "Agender", "Bigender", "Other")
+GOAL_OPTIONS = ("Being a supportive friend", "Romantic relationship", "Emotional support",
+                "Casual chatting", "Deep conversations", "Life advice")
+TONE_OPTIONS = ("Warm and affectionate", "Playful and flirty", "Calm and supportive",
+                "Energetic and enthusiastic", "Intellectual and thoughtful", "Casual and relaxed")
+GENDER_INDEX = {gender: index for index, gender in enumerate(GENDER_OPTIONS)}
+GOAL_INDEX = {goal: index for index, goal in enumerate(GOAL_OPTIONS)}
+TONE_INDEX = {tone: index for index, tone in enumerate(TONE_OPTIONS)}
+
+# Personality trait taxonomy: (category, traits) pairs
+PERSONALITY_TRAITS = (
+    ("Emotional", ("Caring", "Empathetic", "Supportive", "Affectionate", "Protective", "Understanding")),
+    ("Social", ("Outgoing", "Charismatic", "Playful", "Flirty", "Charming", "Witty")),
+    ("Intellectual", ("Smart", "Thoughtful", "Creative", "Curious", "Philosophical", "Analytical")),
+    ("Character", ("Confident", "Adventurous", "Ambitious", "Loyal", "Honest", "Brave")),
+    ("Style", ("Calm", "Energetic", "Relaxed", "Intense", "Mysterious", "Quirky")),
+    ("Communication", ("Good listener", "Talkative", "Direct", "Subtle", "Sarcastic", "Sincere")),
+)
+
+# Quick-select presets: (preset name, traits) pairs
+PERSONALITY_PRESETS = (
+    ("Romantic", ("Caring", "Affectionate", "Supportive", "Charming", "Playful")),
+    ("Best Friend", ("Caring", "Empathetic", "Outgoing", "Witty", "Loyal", "Good listener")),
+    ("Mentor", ("Smart", "Thoughtful", "Supportive", "Understanding", "Good listener", "Sincere")),
+    ("Adventurer", ("Adventurous", "Energetic", "Confident", "Brave", "Charismatic")),
+    ("Artist", ("Creative", "Curious", "Quirky", "Thoughtful", "Sincere")),
+    ("Professional", ("Smart", "Ambitious", "Confident", "Direct", "Analytical")),
+)
+
+# The taxonomy as parallel tuples, with traits addressed by position in ALL_TRAITS
+CATEGORIES = tuple(category for category, _ in PERSONALITY_TRAITS)
+TRAITS_BY_CATEGORY = tuple(traits for _, traits in PERSONALITY_TRAITS)
+ALL_TRAITS = tuple(trait for traits in TRAITS_BY_CATEGORY for trait in traits)
+TRAIT_INDEX = {trait: index for index, trait in enumerate(ALL_TRAITS)}
+# Saved companions store traits lowercased
+TRAIT_INDEX_LOWER = {trait.lower(): index for index, trait in enumerate(ALL_TRAITS)}
+CATEGORY_TRAIT_INDICES = tuple(
+    tuple(TRAIT_INDEX[trait] for trait in traits) for traits in TRAITS_BY_CATEGORY
+)
+
+# Trait check buttons per row in each category
+TRAIT_COLUMNS = 3
+
+# Presets resolved to trait indices once at import
+PRESET_NAMES = tuple(name for name, _ in PERSONALITY_PRESETS)
+PRESET_TRAITS = tuple(
+    tuple(TRAIT_INDEX[trait] for trait in traits) for _, traits in PERSONALITY_PRESETS
+)
+PRESETS_BY_NAME = dict(zip(PRESET_NAMES, PRESET_TRAITS))
+
+
+@Gtk.Template(filename=str(Path(__file__).with_suffix(".ui")))
 class CompanionEditorDialog(Adw.Window):
-    """Dialog for creating/editing a companion (GTK4)."""
+    """Dialog for creating/editing a companion (GTK4).
+
+    The static layout lives in companion_editor_dialog.ui; presets and
+    trait check buttons are built here from the module-level taxonomy.
+    """
+
+    __gtype_name__ = "CompanionEditorDialog"
+
+    preset_info_label = Gtk.Template.Child()
+    avatar_image = Gtk.Template.Child()
+    name_entry = Gtk.Template.Child()
+    gender_combo = Gtk.Template.Child()
+    pronouns_entry = Gtk.Template.Child()
+    preset_box = Gtk.Template.Child()
+    traits_group = Gtk.Template.Child()
+    personality_entry = Gtk.Template.Child()
+    interests_entry = Gtk.Template.Child()
+    questionnaire_status = Gtk.Template.Child()
+    greeting_entry = Gtk.Template.Child()
+    goal_combo = Gtk.Template.Child()
+    tone_combo = Gtk.Template.Child()
+    background_entry = Gtk.Template.Child()
+
+    # Combo row models, created once and shared by every dialog instance
+    _GENDER_MODEL = None
+    _GOAL_MODEL = None
+    _TONE_MODEL = None
 
     def __init__(self, parent, app, companion_data=None, parent_selector=None, is_preset=False):
         """Initialize companion editor dialog.
@@ -28,299 +113,226 @@ class CompanionEditorDialog(Adw.Window):
             parent_selector: The companion selector widget
             is_preset: Whether the companion being edited is a preset
         """
+        # The template sets hide-on-close, so the owner can reuse this dialog via reset()
         super().__init__()
-        self.set_default_size(600, 700)
-        self.set_title("Create Companion" if not companion_data else "Edit Companion")
-        self.set_modal(True)
-        self.set_transient_for(parent)
 
         self.app = app
-        self.editing_id = companion_data["id"] if companion_data else None
-        self.image_path = companion_data.get("image_path") if companion_data else None
+        self.editing_id = None
+        self.image_path = None
         self.parent_selector = parent_selector
-        self.is_preset = is_preset  # Track if editing a preset companion
-
-        # Personality trait checkboxes storage
-        self.personality_checkboxes = {}
-        self.personality_traits = {
-            "Emotional": ["Caring", "Empathetic", "Supportive", "Affectionate", "Protective", "Understanding"],
-            "Social": ["Outgoing", "Charismatic", "Playful", "Flirty", "Charming", "Witty"],
-            "Intellectual": ["Smart", "Thoughtful", "Creative", "Curious", "Philosophical", "Analytical"],
-            "Character": ["Confident", "Adventurous", "Ambitious", "Loyal", "Honest", "Brave"],
-            "Style": ["Calm", "Energetic", "Relaxed", "Intense", "Mysterious", "Quirky"],
-            "Communication": ["Good listener", "Talkative", "Direct", "Subtle", "Sarcastic", "Sincere"],
-        }
+        self.is_preset = False  # Track if editing a preset companion
 
-        # Store existing questionnaire data if editing
-        self.existing_questionnaire_data = companion_data.get("questionnaire_data") if companion_data else None
+        # Personality trait check buttons and their toggled handler ids, indexed by TRAIT_INDEX
+        self._trait_buttons = [None] * len(ALL_TRAITS)
+        self._trait_handler_ids = [None] * len(ALL_TRAITS)
 
-        # Create content
-        self._create_content()
+        # Selected trait indices, kept in selection order (a dict used as an ordered set).
+        # This is the source of truth; buttons are only built once their category is expanded.
+        self._selected_traits = {}
 
-        # Load existing data if editing
-        if companion_data:
-            self._load_companion_data(companion_data)
-
-    def _create_content(self):
-        """Create the dialog content."""
-        # Main box
-        main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
-        main_box.set_margin_start(20)
-        main_box.set_margin_end(20)
-        main_box.set_margin_top(20)
-        main_box.set_margin_bottom(20)
-
-        # Info banner for editing presets
-        self.preset_info_label = Gtk.Label()
-        self.preset_info_label.set_markup(
-            "<span foreground='orange'><i>Editing a preset companion will create a custom copy.</i></span>"
-        )
-        self.preset_info_label.set_wrap(True)
-        self.preset_info_label.set_margin_bottom(10)
-        self.preset_info_label.set_visible(False)  # Hidden by default
-        main_box.append(self.preset_info_label)
-
-        # Scrolled window for content
-        scroll = Gtk.ScrolledWindow()
-        scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
-        scroll.set_vexpand(True)
-
-        content_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
-        scroll.set_child(content_box)
-
-        # Create form sections
-        self._create_basic_fields(content_box)
-        self._create_personality_section(content_box)
-        self._create_details_section(content_box)
-
-        main_box.append(scroll)
-
-        # Button box
-        button_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
-        button_box.set_margin_top(10)
-        button_box.set_halign(Gtk.Align.END)
-
-        cancel_button = Gtk.Button(label="Cancel")
-        cancel_button.connect("clicked", lambda _: self.close())
-        button_box.append(cancel_button)
-
-        save_button = Gtk.Button(label="Save")
-        save_button.add_css_class("suggested-action")
-        save_button.connect("clicked", self._on_save_clicked)
-        button_box.append(save_button)
-
-        main_box.append(button_box)
-        self.set_content(main_box)
-
-    def _create_basic_fields(self, parent):
-        """Create basic form fields."""
-        group = Adw.PreferencesGroup()
-        group.set_title("Basic Information")
-
-        # Avatar section
-        avatar_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
-        avatar_box.set_margin_top(10)
-        avatar_box.set_margin_bottom(10)
-
-        # Avatar preview - use a frame for circular clip
-        avatar_frame = Gtk.Frame()
-        avatar_frame.add_css_class("avatar-editor-frame")
-
-        self.avatar_image = Gtk.Image()
-        self.avatar_image.set_size_request(80, 80)
-        avatar_frame.set_child(self.avatar_image)
-        avatar_box.append(avatar_frame)
-
-        # Avatar buttons
-        button_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=5)
-
-        select_button = Gtk.Button(label="Choose Image...")
-        select_button.connect("clicked", self._on_choose_avatar)
-        button_box.append(select_button)
-
-        remove_button = Gtk.Button(label="Remove Image")
-        remove_button.add_css_class("destructive-action")
-        remove_button.connect("clicked", self._on_remove_avatar)
-        button_box.append(remove_button)
-
-        avatar_box.append(button_box)
-        group.add(avatar_box)
-
-        # Name
-        self.name_entry = Adw.EntryRow()
-        self.name_entry.set_title("Name")
-        group.add(self.name_entry)
-
-        # Gender
-        gender_list = Gtk.StringList()
-        for gender in ["Female", "Male", "Non-Binary", "Genderfluid", "Transgender Woman", "Transgender Man", "Agender", "Bigender", "Other"]:
-            gender_list.append(gender)
-
-        self.gender_combo = Adw.ComboRow()
-        self.gender_combo.set_title("Gender")
-        self.gender_combo.set_model(gender_list)
-        self.gender_combo.set_selected(0)
-        group.add(self.gender_combo)
+        # notify::expanded handler ids for categories whose buttons are not built yet
+        self._expander_handler_ids = {}
 
-        # Pronouns
-        self.pronouns_entry = Adw.EntryRow()
-        self.pronouns_entry.set_title("Pronouns (optional)")
-        group.add(self.pronouns_entry)
+        # Existing questionnaire data if editing
+        self.existing_questionnaire_data = None
 
-        parent.append(group)
+        # Dialog actions, shared by the preset, clear, cancel and save buttons
+        self._create_actions()
 
-        # Load current avatar if editing
-        self._update_avatar_preview()
+        # Create content
+        self._create_content()
 
-    def _create_personality_section(self, parent):
-        """Create personality traits section."""
-        group = Adw.PreferencesGroup()
-        group.set_title("Personality Traits")
-
-        # Quick-select presets
-        preset_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=5)
-
-        self.personality_presets = {
-            "Romantic": ["Caring", "Affectionate", "Supportive", "Charming", "Playful"],
-            "Best Friend": ["Caring", "Empathetic", "Outgoing", "Witty", "Loyal", "Good listener"],
-            "Mentor": ["Smart", "Thoughtful", "Supportive", "Understanding", "Good listener", "Sincere"],
-            "Adventurer": ["Adventurous", "Energetic", "Confident", "Brave", "Charismatic"],
-            "Artist": ["Creative", "Curious", "Quirky", "Thoughtful", "Sincere"],
-            "Professional": ["Smart", "Ambitious", "Confident", "Direct", "Analytical"],
-        }
+        # Fill in the form, loading existing data if editing
+        self.reset(companion_data, is_preset)
 
-        for preset_name, traits in self.personality_presets.items():
-            preset_button = Gtk.Button(label=preset_name)
-            preset_button.connect("clicked", self._on_preset_clicked, traits)
-            preset_box.append(preset_button)
+        # Attach to the parent only once the content is final, so the first realize lays it out once
+        self.set_transient_for(parent)
+        self.set_modal(True)
 
-        clear_button = Gtk.Button(label="Clear All")
-        clear_button.connect("clicked", self._on_clear_traits)
-        preset_box.append(clear_button)
+    def reset(self, companion_data=None, is_preset=False):
+        """Reset the form for a new companion, or load one for editing.
 
-        # Add preset buttons to a row
-        parent.append(preset_box)
+        Args:
+            companion_data: Existing companion data to edit
+            is_preset: Whether the companion being edited is a preset
+        """
+        self.set_title("Create Companion" if not companion_data else "Edit Companion")
+        self.editing_id = companion_data["id"] if companion_data else None
+        self.image_path = None
+        self.is_preset = is_preset
+        self.existing_questionnaire_data = companion_data.get("questionnaire_data") if companion_data else None
 
-        # Create trait categories with trait chips
-        for category, traits in self.personality_traits.items():
-            # Create an expander row for each category
-            expander = Adw.ExpanderRow()
-            expander.set_title(category)
+        for entry in (self.name_entry, self.pronouns_entry, self.personality_entry,
+                      self.interests_entry, self.greeting_entry, self.background_entry):
+            entry.set_text("")
+        for combo in (self.gender_combo, self.goal_combo, self.tone_combo):
+            combo.set_selected(0)
+        self._set_selected_traits(())
 
-            # Create a flow box for trait chips
-            flow_box = Gtk.FlowBox()
-            flow_box.set_selection_mode(Gtk.SelectionMode.NONE)
-            flow_box.set_homogeneous(True)
-            flow_box.set_margin_start(10)
-            flow_box.set_margin_end(10)
-            flow_box.set_margin_top(5)
-            flow_box.set_margin_bottom(5)
-
-            # Add traits as toggle buttons (chips)
-            for trait in traits:
-                toggle_button = Gtk.ToggleButton(label=trait)
-                toggle_button.add_css_class("trait-chip")
-                toggle_button.connect("toggled", self._on_trait_toggled, trait)
-                self.personality_checkboxes[trait] = toggle_button
-                flow_box.append(toggle_button)
-
-            expander.add_action(flow_box)
-            group.add(expander)
-
-        parent.append(group)
-
-        # Additional personality details
-        details_group = Adw.PreferencesGroup()
-        details_group.set_title("Additional Details")
-
-        # Additional personality text area
-        self.personality_entry = Adw.EntryRow()
-        self.personality_entry.set_title("Additional Personality Details")
-        details_group.add(self.personality_entry)
+        self.questionnaire_status.set_markup("<small>Generate a detailed 50-question personality profile based on traits.</small>")
+        self.preset_info_label.set_visible(False)
 
-        # Interests
-        self.interests_entry = Adw.EntryRow()
-        self.interests_entry.set_title("Interests")
-        details_group.add(self.interests_entry)
+        if companion_data:
+            self._load_companion_data(companion_data)
+        else:
+            self._update_avatar_preview()
 
-        parent.append(details_group)
+    def _create_actions(self):
+        """Install the editor action group used by the dialog buttons."""
+        group = Gio.SimpleActionGroup()
 
-        # Add Personality Questionnaire button
-        questionnaire_group = Adw.PreferencesGroup()
-        questionnaire_group.set_title("AI Personality Profile")
+        apply_preset = Gio.SimpleAction.new("apply-preset", GLib.VariantType.new("s"))
+        apply_preset.connect("activate", self._on_preset_activated)
+        group.add_action(apply_preset)
 
-        questionnaire_button = Gtk.Button(label="Generate Personality Profile")
-        questionnaire_button.add_css_class("suggested-action")
-        questionnaire_button.connect("clicked", self._on_questionnaire_clicked)
-        questionnaire_group.add(questionnaire_button)
+        for name, callback in (
+            ("clear-traits", self._on_clear_traits),
+            ("cancel", lambda action, param: self.close()),
+            ("save", self._on_save_clicked),
+        ):
+            action = Gio.SimpleAction.new(name, None)
+            action.connect("activate", callback)
+            group.add_action(action)
 
-        self.questionnaire_status = Gtk.Label()
-        self.questionnaire_status.set_markup("<small>Generate a detailed 50-question personality profile based on traits.</small>")
-        self.questionnaire_status.set_wrap(True)
-        questionnaire_group.add(self.questionnaire_status)
+        self.insert_action_group("editor", group)
 
-        parent.append(questionnaire_group)
+    def _create_content(self):
+        """Fill in the parts of the dialog that are not in the template."""
+        # Combo row models; selection is kept per combo row, so the models can be shared
+        self._ensure_models()
+        self.gender_combo.set_model(self._GENDER_MODEL)
+        self.goal_combo.set_model(self._GOAL_MODEL)
+        self.tone_combo.set_model(self._TONE_MODEL)
+
+        self._create_personality_section()
+
+    @classmethod
+    def _ensure_models(cls):
+        """Create the shared combo row models on first use."""
+        if cls._GENDER_MODEL is None:
+            cls._GENDER_MODEL = Gtk.StringList.new(list(GENDER_OPTIONS))
+            cls._GOAL_MODEL = Gtk.StringList.new(list(GOAL_OPTIONS))
+            cls._TONE_MODEL = Gtk.StringList.new(list(TONE_OPTIONS))
+
+    def _create_personality_section(self):
+        """Create the preset buttons and trait category rows."""
+        # Quick-select presets, placed ahead of the Clear All button
+        for preset_name in reversed(PRESET_NAMES):
+            preset_button = Gtk.Button(label=preset_name)
+            preset_button.set_action_name("editor.apply-preset")
+            preset_button.set_action_target_value(GLib.Variant.new_string(preset_name))
+            self.preset_box.prepend(preset_button)
 
-    def _on_trait_toggled(self, button, trait):
-        """Handle trait chip toggle - update styling."""
+        # Create trait categories; the buttons are built when a category is first expanded
+        self.traits_group.freeze_notify()
+        for category_index, category in enumerate(CATEGORIES):
+            # Create an expander row for each category
+            expander = Adw.ExpanderRow()
+            expander.set_title(category)
+            self._expander_handler_ids[category_index] = expander.connect(
+                "notify::expanded", self._lazy_populate_traits, category_index
+            )
+            self.traits_group.add(expander)
+        self.traits_group.thaw_notify()
+
+    def _lazy_populate_traits(self, expander, pspec, category_index):
+        """Build a category's trait check buttons the first time it is expanded."""
+        if not expander.get_expanded():
+            return
+        # Only needed once; drop the handler so later expands cost nothing
+        expander.disconnect(self._expander_handler_ids.pop(category_index))
+
+        # Create a grid for the trait check buttons
+        grid = Gtk.Grid(column_spacing=6, row_spacing=4)
+        grid.freeze_notify()
+        grid.set_margin_start(10)
+        grid.set_margin_end(10)
+        grid.set_margin_top(5)
+        grid.set_margin_bottom(5)
+
+        # Add traits as check buttons in TRAIT_COLUMNS columns, restoring any selection made while collapsed
+        for position, index in enumerate(CATEGORY_TRAIT_INDICES[category_index]):
+            check_button = Gtk.CheckButton(label=ALL_TRAITS[index])
+            check_button.set_active(index in self._selected_traits)
+            self._trait_handler_ids[index] = check_button.connect("toggled", self._on_trait_toggled, index)
+            self._trait_buttons[index] = check_button
+            grid.attach(check_button, position % TRAIT_COLUMNS, position // TRAIT_COLUMNS, 1, 1)
+
+        grid.thaw_notify()
+        expander.add_row(grid)
+
+    def _on_trait_toggled(self, button, index):
+        """Handle trait check button toggle - update the selection."""
         if button.get_active():
-            button.add_css_class("selected")
+            self._selected_traits[index] = None
         else:
-            button.remove_css_class("selected")
+            self._selected_traits.pop(index, None)
 
-    def _on_preset_clicked(self, button, traits):
-        """Handle preset button click - select those traits."""
-        # First clear all
-        self._on_clear_traits(button)
+    def _on_preset_activated(self, action, param):
+        """Handle the apply-preset action - select the preset's traits."""
+        self._set_selected_traits(PRESETS_BY_NAME[param.get_string()])
 
-        # Then select the preset traits
-        for trait in traits:
-            if trait in self.personality_checkboxes:
-                toggle_button = self.personality_checkboxes[trait]
-                toggle_button.set_active(True)
-                toggle_button.add_css_class("selected")
-
-    def _on_clear_traits(self, button):
+    def _on_clear_traits(self, action, param):
         """Clear all personality trait selections."""
-        for toggle_button in self.personality_checkboxes.values():
-            toggle_button.set_active(False)
-            toggle_button.remove_css_class("selected")
+        self._set_selected_traits(())
 
-    def _get_partial_companion_data(self) -> dict:
-        """Get current companion data from the form (may be incomplete)."""
-        # Get selected traits
-        selected_traits = []
-        for trait, checkbox in self.personality_checkboxes.items():
-            if checkbox.get_active():
-                selected_traits.append(trait.lower())
+    def _set_selected_traits(self, indices):
+        """Replace the trait selection and update the check buttons in one pass.
 
-        # Get interests
+        Only buttons whose state changes are touched, with their toggled
+        handlers blocked while they change.
+        """
+        self._selected_traits.clear()
+        self._selected_traits.update(dict.fromkeys(indices))
+
+        for index, check_button in enumerate(self._trait_buttons):
+            if check_button is None:
+                continue
+            active = index in self._selected_traits
+            if check_button.get_active() == active:
+                continue
+            handler_id = self._trait_handler_ids[index]
+            check_button.handler_block(handler_id)
+            check_button.set_active(active)
+            check_button.handler_unblock(handler_id)
+
+    def _collect_form(self) -> dict:
+        """Read every form field once, without applying any defaults."""
         interests_text = self.interests_entry.get_text().strip()
-        interests = [i.strip() for i in interests_text.split(",")] if interests_text else []
 
         return {
-            "name": self.name_entry.get_text().strip() or "Companion",
-            "gender": self.gender_combo.get_selected_item().get_string() if self.gender_combo.get_selected_item() else "Female",
+            "name": self.name_entry.get_text().strip(),
+            "gender": self._selected_option(self.gender_combo, GENDER_OPTIONS),
             "pronouns": self.pronouns_entry.get_text().strip(),
             "personality": self.personality_entry.get_text().strip(),
-            "personality_traits": selected_traits,
-            "interests": interests,
-            "tone": self.tone_combo.get_selected_item().get_string() if self.tone_combo.get_selected_item() else "Warm and affectionate",
-            "relationship_goal": self.goal_combo.get_selected_item().get_string() if self.goal_combo.get_selected_item() else "Being a supportive friend",
+            "personality_traits": [ALL_TRAITS[index].lower() for index in self._selected_traits],
+            "interests": [i for i in _INTEREST_SEP.split(interests_text) if i] if interests_text else [],
+            "tone": self._selected_option(self.tone_combo, TONE_OPTIONS),
+            "relationship_goal": self._selected_option(self.goal_combo, GOAL_OPTIONS),
             "background": self.background_entry.get_text().strip(),
             "greeting": self.greeting_entry.get_text().strip(),
         }
 
+    def _get_partial_companion_data(self) -> dict:
+        """Get current companion data from the form (may be incomplete)."""
+        data = self._collect_form()
+        data["name"] = data["name"] or "Companion"
+        return data
+
+    @staticmethod
+    def _selected_option(combo, options):
+        """Return the option selected in a combo row, or the first one if none is."""
+        index = combo.get_selected()
+        return options[index] if index < len(options) else options[0]
+
+    @Gtk.Template.Callback()
     def _on_questionnaire_clicked(self, button):
         """Handle questionnaire button click - open the questionnaire dialog."""
         # Get current companion data from form (may be partial)
         current_data = self._get_partial_companion_data()
 
-        # Import here to avoid circular import
-        from personality_questionnaire_dialog import PersonalityQuestionnaireDialog
-
         # Create and show the questionnaire dialog
-        dialog = PersonalityQuestionnaireDialog(
+        dialog = _questionnaire_dialog_cls()(
             parent=self,
             ai_backend=self.app.ai_backend,
             companion_data=current_data,
@@ -346,47 +358,7 @@ class CompanionEditorDialog(Adw.Window):
             "<span foreground='green'><small>✓ Personality profile generated and added!</small></span>"
         )
 
-    def _create_details_section(self, parent):
-        """Create additional details section."""
-        group = Adw.PreferencesGroup()
-        group.set_title("Details")
-
-        # Greeting
-        self.greeting_entry = Adw.EntryRow()
-        self.greeting_entry.set_title("Greeting Message")
-        group.add(self.greeting_entry)
-
-        # Relationship goal
-        goal_list = Gtk.StringList()
-        for goal in ["Being a supportive friend", "Romantic relationship", "Emotional support",
-                     "Casual chatting", "Deep conversations", "Life advice"]:
-            goal_list.append(goal)
-
-        self.goal_combo = Adw.ComboRow()
-        self.goal_combo.set_title("Relationship Goal")
-        self.goal_combo.set_model(goal_list)
-        self.goal_combo.set_selected(0)
-        group.add(self.goal_combo)
-
-        # Tone
-        tone_list = Gtk.StringList()
-        for tone in ["Warm and affectionate", "Playful and flirty", "Calm and supportive",
-                     "Energetic and enthusiastic", "Intellectual and thoughtful", "Casual and relaxed"]:
-            tone_list.append(tone)
-
-        self.tone_combo = Adw.ComboRow()
-        self.tone_combo.set_title("Communication Tone")
-        self.tone_combo.set_model(tone_list)
-        self.tone_combo.set_selected(0)
-        group.add(self.tone_combo)
-
-        # Background
-        self.background_entry = Adw.EntryRow()
-        self.background_entry.set_title("Background Story")
-        group.add(self.background_entry)
-
-        parent.append(group)
-
+    @Gtk.Template.Callback()
     def _on_choose_avatar(self, button):
         """Handle avatar image selection button click."""
         # Create file chooser dialog
@@ -431,6 +403,7 @@ class CompanionEditorDialog(Adw.Window):
         cropper = AvatarCropperDialog(self, file_path, on_crop_complete)
         cropper.present()
 
+    @Gtk.Template.Callback()
     def _on_remove_avatar(self, button):
         """Handle remove avatar button click."""
         self.image_path = None
@@ -469,19 +442,27 @@ class CompanionEditorDialog(Adw.Window):
         self.name_entry.set_text(data.get("name", ""))
 
         # Set gender
-        gender = data.get("gender", "")
-        gender_options = ["Female", "Male", "Non-Binary", "Genderfluid", "Transgender Woman",
-                         "Transgender Man", "Agender", "Bigender", "Other"]
-        if gender in gender_options:
-            self.gender_combo.set_selected(gender_options.index(gender))
+        index = GENDER_INDEX.get(data.get("gender"))
+        if index is not None:
+            self.gender_combo.set_selected(index)
 
         # Pronouns
         if "pronouns" in data:
             self.pronouns_entry.set_text(data["pronouns"])
 
-        # Personality
+        # Personality traits
+        traits = data.get("personality_traits", [])
+        indices = [TRAIT_INDEX_LOWER[t.lower()] for t in traits if t.lower() in TRAIT_INDEX_LOWER]
+        self._set_selected_traits(indices)
+
+        # Personality, minus the trait sentence that saving adds back from the selected traits
         if "personality" in data:
-            self.personality_entry.set_text(data["personality"])
+            personality = data["personality"]
+            if traits:
+                trait_sentence = _trait_sentence(data.get("name", ""), traits)
+                if personality.startswith(trait_sentence):
+                    personality = personality[len(trait_sentence):].lstrip()
+            self.personality_entry.set_text(personality)
 
         # Interests
         if "interests" in data:
@@ -492,18 +473,14 @@ class CompanionEditorDialog(Adw.Window):
             self.greeting_entry.set_text(data["greeting"])
 
         # Relationship goal
-        goal = data.get("relationship_goal", "")
-        goal_options = ["Being a supportive friend", "Romantic relationship", "Emotional support",
-                        "Casual chatting", "Deep conversations", "Life advice"]
-        if goal in goal_options:
-            self.goal_combo.set_selected(goal_options.index(goal))
+        index = GOAL_INDEX.get(data.get("relationship_goal"))
+        if index is not None:
+            self.goal_combo.set_selected(index)
 
         # Tone
-        tone = data.get("tone", "")
-        tone_options = ["Warm and affectionate", "Playful and flirty", "Calm and supportive",
-                        "Energetic and enthusiastic", "Intellectual and thoughtful", "Casual and relaxed"]
-        if tone in tone_options:
-            self.tone_combo.set_selected(tone_options.index(tone))
+        index = TONE_INDEX.get(data.get("tone"))
+        if index is not None:
+            self.tone_combo.set_selected(index)
 
         # Background
         if "background" in data:
@@ -513,74 +490,97 @@ class CompanionEditorDialog(Adw.Window):
         if self.is_preset:
             self.preset_info_label.set_visible(True)
 
-    def _on_save_clicked(self, button):
-        """Handle save button click."""
+    def _on_save_clicked(self, action, param):
+        """Handle the save action."""
         companion_data = self.get_companion_data()
 
         # If editing a preset, convert it to a custom companion
         if self.is_preset:
             # Create a new custom ID
             original_id = self.editing_id
-            name = self.name_entry.get_text().strip().lower().replace(" ", "_")
-            companion_data["id"] = f"custom_{name}_{uuid.uuid4().hex[:8]}"
+            name = companion_data["name"].lower().replace(" ", "_")
+            companion_data["id"] = f"custom_{name}_{os.urandom(4).hex()}"
             companion_data["original_preset_id"] = original_id
 
             # Optionally hide the original preset
             # self.app.companion_manager._hide_preset(original_id)
 
-        self.app.companion_manager.save_custom(companion_data)
+        # Close dialog right away and write the companion file in the background
+        self.close()
+
+        thread = threading.Thread(target=self._save_in_background, args=(companion_data,))
+        thread.start()
 
-        # Reload companions in selector
+    def _save_in_background(self, companion_data: dict):
+        """Save the companion off the main loop, then report back on it."""
+        try:
+            self.app.companion_manager.save_custom(companion_data)
+        except Exception as e:
+            GLib.idle_add(self._on_save_failed, str(e))
+            return
+
+        GLib.idle_add(self._on_save_finished)
+
+    def _on_save_finished(self):
+        """Reload companions in the selector once the save has completed."""
         if self.parent_selector:
             self.parent_selector._load_companions()
 
-        # Close dialog
-        self.close()
+    def _on_save_failed(self, error_message: str):
+        """Report a failed save."""
+        print(f"Error saving companion: {error_message}")
+        if self.parent_selector:
+            toast = Adw.Toast(title=f"Could not save companion: {error_message}")
+            self.parent_selector.main_window.toast_overlay.add_toast(toast)
 
     def get_companion_data(self):
         """Get the companion data from the form."""
+        form = self._collect_form()
+        name_text = form["name"]
+
         # Generate ID if new
         if self.editing_id:
             companion_id = self.editing_id
         else:
             # Generate from name
-            name = self.name_entry.get_text().strip().lower().replace(" ", "_")
-            companion_id = f"custom_{name}_{uuid.uuid4().hex[:8]}"
-
-        # Get interests
-        interests_text = self.interests_entry.get_text().strip()
-        interests = [i.strip() for i in interests_text.split(",")] if interests_text else []
-
-        # Build personality from selected traits
-        selected_traits = []
-        for trait, checkbox in self.personality_checkboxes.items():
-            if checkbox.get_active():
-                selected_traits.append(trait.lower())
-
-        # Get custom personality text
-        custom_personality = self.personality_entry.get_text().strip()
+            name = name_text.lower().replace(" ", "_")
+            companion_id = f"custom_{name}_{os.urandom(4).hex()}"
 
-        # Combine traits and custom text
-        personality_parts = []
+        # Combine selected traits and custom personality text
+        selected_traits = form["personality_traits"]
+        custom_personality = form["personality"]
         if selected_traits:
-            # Capitalize first letter of each trait
-            traits_formatted = ", ".join([t.capitalize() for t in selected_traits])
-            personality_parts.append(f"{self.name_entry.get_text().strip()} is {traits_formatted}.")
-        if custom_personality:
-            personality_parts.append(custom_personality)
-
-        personality = " ".join(personality_parts) if personality_parts else "A friendly and supportive companion."
+            personality = _trait_sentence(name_text, selected_traits)
+            if custom_personality:
+                personality = f"{personality} {custom_personality}"
+        else:
+            personality = custom_personality or "A friendly and supportive companion."
 
         return {
             "id": companion_id,
-            "name": self.name_entry.get_text().strip(),
-            "gender": self.gender_combo.get_selected_item().get_string(),
-            "pronouns": self.pronouns_entry.get_text().strip(),
+            "name": name_text,
+            "gender": form["gender"],
+            "pronouns": form["pronouns"],
             "personality": personality,
-            "interests": interests,
-            "greeting": self.greeting_entry.get_text().strip(),
-            "relationship_goal": self.goal_combo.get_selected_item().get_string(),
-            "tone": self.tone_combo.get_selected_item().get_string(),
-            "background": self.background_entry.get_text().strip(),
+            "personality_traits": selected_traits,
+            "interests": form["interests"],
+            "greeting": form["greeting"],
+            "relationship_goal": form["relationship_goal"],
+            "tone": form["tone"],
+            "background": form["background"],
             "image_path": self.image_path,
         }
+
+
+def _trait_sentence(name: str, traits) -> str:
+    """Describe a companion's traits, e.g. "Mia is Caring, Witty."."""
+    # Capitalize first letter of each trait
+    traits_formatted = ", ".join(t.capitalize() for t in traits)
+    return f"{name} is {traits_formatted}."
+
+
+@functools.cache
+def _questionnaire_dialog_cls():
+    """Import the questionnaire dialog on first use, avoiding a circular import."""
+    from personality_questionnaire_dialog import PersonalityQuestionnaireDialog
+    return PersonalityQuestionnaireDialog
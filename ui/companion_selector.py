@@ -6,27 +6,176 @@ All rights reserved.
 
 Part of the Kardia AI Companion application.
 """
+import functools
 import gi
+import itertools
+import os
 import random
+from collections import OrderedDict
+from pathlib import Path
 
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
-from gi.repository import Gtk, Adw, Gdk, GLib, Pango, GdkPixbuf
+from gi.repository import Gtk, Adw, Gdk, GLib, Gio, GObject, GdkPixbuf
 
-from companion_data.models import Companion
+from companion_data.models import Companion, gender_matches
+
+# Pre-scaled avatar textures keyed by (path, mtime), least recently used first
+_AVATAR_CACHE = OrderedDict()
+_AVATAR_CACHE_SIZE = 128
+# Avatars are shown at 48x48; load at twice that for HiDPI displays
+_AVATAR_LOAD_SIZE = 96
+
+
+def _get_avatar_texture(image_path: str):
+    """Get a downscaled avatar texture, loading it only if not cached.
+
+    Returns None if the image cannot be loaded.
+    """
+    try:
+        key = (image_path, os.stat(image_path).st_mtime)
+    except OSError as e:
+        print(f"Error loading companion image {image_path}: {e}")
+        return None
+
+    texture = _AVATAR_CACHE.get(key)
+    if texture is not None:
+        _AVATAR_CACHE.move_to_end(key)
+        return texture
+
+    try:
+        pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
+            image_path, _AVATAR_LOAD_SIZE, _AVATAR_LOAD_SIZE, True
+        )
+    except GLib.Error as e:
+        print(f"Error loading companion image {image_path}: {e}")
+        return None
+
+    texture = Gdk.Texture.new_for_pixbuf(pixbuf)
+    _AVATAR_CACHE[key] = texture
+    if len(_AVATAR_CACHE) > _AVATAR_CACHE_SIZE:
+        _AVATAR_CACHE.popitem(last=False)
+    return texture
+
+
+class CompanionItem(GObject.Object):
+    """List model item holding the display data for one companion."""
+
+    __gtype_name__ = "CompanionItem"
+
+    companion_id = GObject.Property(type=str, default="")
+    name = GObject.Property(type=str, default="")
+    gender = GObject.Property(type=str, default="")
+    personality = GObject.Property(type=str, default="")
+    image_path = GObject.Property(type=str, default="")
+
+    def __init__(self, companion_data: dict):
+        """Create an item from a companion data dict."""
+        super().__init__(
+            companion_id=companion_data["id"],
+            name=companion_data["name"],
+            gender=companion_data["gender"],
+            personality=companion_data["personality"],
+            image_path=companion_data.get("image_path") or "",
+        )
+        # Only the first three interests are shown as tags
+        self.interests = tuple(companion_data["interests"][:3])
+
+
+@Gtk.Template(filename=str(Path(__file__).parent / "companion_row.ui"))
+class CompanionRow(Gtk.Box):
+    """Recyclable row widget for the companion list, laid out in companion_row.ui."""
+
+    __gtype_name__ = "CompanionRow"
+
+    avatar_picture = Gtk.Template.Child()
+    avatar_label = Gtk.Template.Child()
+    name_label = Gtk.Template.Child()
+    personality_label = Gtk.Template.Child()
+    tag_label_1 = Gtk.Template.Child()
+    tag_label_2 = Gtk.Template.Child()
+    tag_label_3 = Gtk.Template.Child()
+    select_button = Gtk.Template.Child()
+    edit_button = Gtk.Template.Child()
+    delete_button = Gtk.Template.Child()
+
+    def __init__(self):
+        """Create the row; content is filled in by bind()."""
+        super().__init__()
+        self.tag_labels = (self.tag_label_1, self.tag_label_2, self.tag_label_3)
+
+    def bind(self, item: CompanionItem):
+        """Show a companion in this row."""
+        companion_id = GLib.Variant.new_string(item.companion_id)
+        self.select_button.set_action_target_value(companion_id)
+        self.edit_button.set_action_target_value(companion_id)
+        self.delete_button.set_action_target_value(
+            GLib.Variant("(ss)", (item.companion_id, item.name))
+        )
+
+        texture = _get_avatar_texture(item.image_path) if item.image_path else None
+        if texture:
+            self.avatar_picture.set_paintable(texture)
+            self.avatar_picture.set_visible(True)
+            self.avatar_label.set_visible(False)
+        else:
+            self.avatar_label.set_label(item.name[0].upper() if item.name else "?")
+            self.avatar_label.set_visible(True)
+            self.avatar_picture.set_visible(False)
+
+        self.name_label.set_markup(f"<b>{item.name}</b> ({item.gender})")
+        self.personality_label.set_label(item.personality)
+
+        for tag, interest in zip(self.tag_labels, item.interests):
+            tag.set_label(interest)
+            tag.set_visible(True)
+        for tag in self.tag_labels[len(item.interests):]:
+            tag.set_visible(False)
+
+    def unbind(self):
+        """Drop the row's reference to its avatar before it is recycled."""
+        self.avatar_picture.set_paintable(None)
 
 
 class CompanionSelector(Gtk.Box):
     """Companion selection widget (GTK4)."""
 
+    # Companions added to the list per main loop iteration while loading
+    LOAD_BATCH_SIZE = 20
+
     def __init__(self, main_window):
         """Initialize companion selector."""
         super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=10)
         self.main_window = main_window
+        self._filter_type = None
+        self._loader_token = None
 
+        # Filter clicks are coalesced; the latest one is applied after a short delay
+        self._pending_filter = None
+        self._filter_source_id = None
+
+        # Companion editor, built on first use and reused afterwards
+        self._editor_dialog = None
+
+        self._create_actions()
         self._create_ui()
         self._load_companions()
 
+    def _create_actions(self):
+        """Install the row actions shared by every companion row."""
+        group = Gio.SimpleActionGroup()
+
+        for name, parameter_type, callback in (
+            ("chat", "s", self._on_companion_selected),
+            ("edit", "s", self._on_edit_companion),
+            ("delete", "(ss)", self._on_delete_companion),
+        ):
+            action = Gio.SimpleAction.new(name, GLib.VariantType.new(parameter_type))
+            action.connect("activate", callback)
+            group.add_action(action)
+
+        self.insert_action_group("sel", group)
+
     def _create_ui(self):
         """Create the UI."""
         # Title
@@ -75,161 +224,120 @@ class CompanionSelector(Gtk.Box):
         scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
         scroll.set_vexpand(True)
 
-        # Clamp to constrain max width
-        clamp = Adw.Clamp()
+        # Scrollable clamp to constrain max width without defeating list view recycling
+        clamp = Adw.ClampScrollable()
         clamp.set_maximum_size(800)
         clamp.set_tightening_threshold(600)
 
-        # Companion list
-        self.companion_list = Gtk.ListBox()
-        self.companion_list.set_selection_mode(Gtk.SelectionMode.NONE)
+        # Companion list: a list store filtered by gender, shown through recycled rows
+        self.companion_store = Gio.ListStore.new(CompanionItem)
+        self.companion_filter = Gtk.CustomFilter.new(self._filter_companion)
+        filter_model = Gtk.FilterListModel.new(self.companion_store, self.companion_filter)
+        # Filter in idle-time chunks so a filter change never blocks on the whole store
+        filter_model.set_incremental(True)
+
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self._on_row_setup)
+        factory.connect("bind", self._on_row_bind)
+        factory.connect("unbind", self._on_row_unbind)
+
+        self.companion_list = Gtk.ListView.new(Gtk.NoSelection.new(filter_model), factory)
+        self.companion_list.set_single_click_activate(False)
         self.companion_list.set_margin_top(10)
         self.companion_list.set_margin_bottom(10)
-        self.companion_list.add_css_class("boxed-list")
 
         clamp.set_child(self.companion_list)
         scroll.set_child(clamp)
         self.append(scroll)
 
     def _load_companions(self, filter_type=None):
-        """Load companions into the list."""
-        # Clear existing
-        child = self.companion_list.get_first_child()
-        while child:
-            next_child = child.get_next_sibling()
-            self.companion_list.remove(child)
-            child = next_child
-
-        # Get companions
-        if filter_type:
-            companions = self.main_window.app.companion_manager.filter_companions(
-                gender=filter_type
-            )
-        else:
-            companions = self.main_window.app.companion_manager.get_all_companions()
-
-        # Add each companion
-        for companion_data in companions:
-            row = self._create_companion_row(companion_data)
-            self.companion_list.append(row)
-
-    def _create_companion_row(self, companion_data: dict) -> Gtk.ListBoxRow:
-        """Create a row for a companion."""
-        row = Gtk.ListBoxRow()
-        row.set_selectable(False)
-        row.add_css_class("card")
-
-        # Main box
-        box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=15)
-        box.set_margin_start(15)
-        box.set_margin_end(15)
-        box.set_margin_top(10)
-        box.set_margin_bottom(10)
-
-        # Avatar with initial or image
-        avatar = self._create_companion_avatar(companion_data)
-        box.append(avatar)
-
-        # Info section
-        info_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=5)
-        info_box.set_hexpand(True)
-
-        # Name and gender
-        name_markup = f"<b>{companion_data['name']}</b> ({companion_data['gender']})"
-        name_label = Gtk.Label()
-        name_label.set_markup(name_markup)
-        name_label.set_halign(Gtk.Align.START)
-        name_label.set_ellipsize(Pango.EllipsizeMode.END)
-        info_box.append(name_label)
-
-        # Personality preview
-        personality_text = companion_data["personality"][:80] + "..."
-        personality_label = Gtk.Label(label=personality_text)
-        personality_label.set_halign(Gtk.Align.START)
-        personality_label.set_ellipsize(Pango.EllipsizeMode.END)
-        personality_label.add_css_class("dim-label")
-        info_box.append(personality_label)
-
-        # Interests as tags
-        interests_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=5)
-
-        for interest in companion_data["interests"][:3]:
-            tag = Gtk.Label(label=interest)
-            tag.add_css_class("tag")
-            interests_box.append(tag)
-
-        info_box.append(interests_box)
-        box.append(info_box)
-
-        # Buttons
-        button_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=5)
-
-        # Select button
-        select_button = Gtk.Button(label="Chat")
-        select_button.add_css_class("suggested-action")
-        select_button.connect("clicked", self._on_companion_selected, companion_data["id"])
-        button_box.append(select_button)
-
-        # Edit button (for all companions)
-        edit_button = Gtk.Button(label="Edit")
-        edit_button.connect("clicked", self._on_edit_companion, companion_data["id"])
-        button_box.append(edit_button)
-
-        # Delete button (for all companions)
-        delete_button = Gtk.Button(label="Delete")
-        delete_button.add_css_class("destructive-action")
-        delete_button.connect("clicked", self._on_delete_companion, companion_data["id"], companion_data["name"])
-        button_box.append(delete_button)
-
-        box.append(button_box)
-        row.set_child(box)
-
-        return row
-
-    def _create_avatar(self, name: str) -> Gtk.Image:
-        """Create a colored avatar with the name's initial."""
-        # Get first letter
-        initial = name[0].upper() if name else "?"
-
-        # For simplicity, use a label with colored background
-        avatar = Gtk.Label()
-        avatar.set_label(initial)
-        avatar.set_width_chars(3)
-        avatar.add_css_class("avatar")
-
-        return avatar
-
-    def _create_companion_avatar(self, companion_data: dict):
-        """Create an avatar for a companion, using image if available."""
-        # Check if companion has an image
-        if "image_path" in companion_data and companion_data["image_path"]:
-            try:
-                # Use Gtk.Picture for better image handling
-                picture = Gtk.Picture.new_for_filename(companion_data["image_path"])
-                picture.set_size_request(48, 48)
-                picture.set_can_shrink(False)
-                picture.add_css_class("avatar-picture")
-                return picture
-            except Exception as e:
-                print(f"Error loading companion image for {companion_data.get('name')}: {e}")
-
-        # Fall back to text avatar
-        return self._create_avatar(companion_data["name"])
+        """Load companions into the list.
+
+        The first batch is added straight away and the rest from idle
+        callbacks, so the list paints before every companion is loaded.
+        """
+        companions = self.main_window.app.companion_manager.get_all_companions()
+
+        self.companion_store.remove_all()
+        self._set_filter(filter_type)
+
+        # A newer load invalidates any batches still pending from this one
+        self._loader_token = token = object()
+        pending = iter(companions)
+        if self._pump_loader(token, pending):
+            GLib.idle_add(self._pump_loader, token, pending, priority=GLib.PRIORITY_DEFAULT_IDLE)
+
+    def _pump_loader(self, token, pending) -> bool:
+        """Add the next batch of companions; returns whether more remain."""
+        if token is not self._loader_token:
+            return GLib.SOURCE_REMOVE
+
+        items = [
+            CompanionItem(companion_data)
+            for companion_data in itertools.islice(pending, self.LOAD_BATCH_SIZE)
+        ]
+        self.companion_store.splice(self.companion_store.get_n_items(), 0, items)
+
+        if len(items) < self.LOAD_BATCH_SIZE:
+            return GLib.SOURCE_REMOVE
+        return GLib.SOURCE_CONTINUE
+
+    def _set_filter(self, filter_type):
+        """Show only companions matching a gender filter (None shows all)."""
+        self._filter_type = filter_type
+        self.companion_filter.changed(Gtk.FilterChange.DIFFERENT)
+
+    def _filter_companion(self, item: CompanionItem) -> bool:
+        """Filter function for the companion list."""
+        return self._filter_type is None or gender_matches(item.gender, self._filter_type)
+
+    def _on_row_setup(self, factory, list_item):
+        """Create a row widget that will be reused for many companions."""
+        list_item.set_child(CompanionRow())
+
+    def _on_row_bind(self, factory, list_item):
+        """Show the list item's companion in its row."""
+        list_item.get_child().bind(list_item.get_item())
+
+    def _on_row_unbind(self, factory, list_item):
+        """Clear a row before it is recycled."""
+        list_item.get_child().unbind()
 
     def _on_filter_clicked(self, button, filter_type):
         """Handle filter button click."""
-        self._load_companions(filter_type)
+        self._pending_filter = filter_type
+        if self._filter_source_id is None:
+            self._filter_source_id = GLib.timeout_add(50, self._apply_pending_filter)
+
+    def _apply_pending_filter(self):
+        """Apply the most recently clicked filter."""
+        self._filter_source_id = None
+        self._set_filter(self._pending_filter)
+        return GLib.SOURCE_REMOVE
+
+    def _show_editor(self, companion_data=None, is_preset=False):
+        """Show the companion editor, reusing the existing dialog if there is one."""
+        if self._editor_dialog is None:
+            self._editor_dialog = _editor_dialog_cls()(
+                self.main_window,
+                self.main_window.app,
+                companion_data,
+                parent_selector=self,
+                is_preset=is_preset
+            )
+        else:
+            self._editor_dialog.reset(companion_data, is_preset)
+            self._editor_dialog.set_transient_for(self.main_window)
+
+        self._editor_dialog.present()
 
     def _on_create_companion(self, button):
         """Handle create companion button click."""
-        from companion_editor_dialog import CompanionEditorDialog
-
-        dialog = CompanionEditorDialog(self.main_window, self.main_window.app, parent_selector=self)
-        dialog.present()
+        self._show_editor()
 
-    def _on_edit_companion(self, button, companion_id: str):
-        """Handle edit companion button click."""
-        from companion_editor_dialog import CompanionEditorDialog
+    def _on_edit_companion(self, action, param):
+        """Handle the edit action for a companion row."""
+        companion_id = param.get_string()
 
         # Get companion data - check both custom and preset
         companion_data = self.main_window.app.companion_manager.get_custom(companion_id)
@@ -242,17 +350,12 @@ class CompanionSelector(Gtk.Box):
         if not companion_data:
             return
 
-        dialog = CompanionEditorDialog(
-            self.main_window,
-            self.main_window.app,
-            companion_data,
-            parent_selector=self,
-            is_preset=is_preset
-        )
-        dialog.present()
+        self._show_editor(companion_data, is_preset)
+
+    def _on_delete_companion(self, action, param):
+        """Handle the delete action for a companion row."""
+        companion_id, companion_name = param.unpack()
 
-    def _on_delete_companion(self, button, companion_id: str, companion_name: str):
-        """Handle delete companion button click."""
         # Delete the companion (works for both custom and preset)
         self.main_window.app.companion_manager.delete_companion(companion_id)
 
@@ -263,10 +366,18 @@ class CompanionSelector(Gtk.Box):
         toast = Adw.Toast(title=f"'{companion_name}' deleted")
         self.main_window.toast_overlay.add_toast(toast)
 
-    def _on_companion_selected(self, button, companion_id: str):
-        """Handle companion selection."""
+    def _on_companion_selected(self, action, param):
+        """Handle the chat action for a companion row."""
+        companion_id = param.get_string()
         companion = self.main_window.app.companion_manager.create_companion(
             companion_id
         )
         if companion:
             self.main_window.on_companion_selected(companion)
+
+
+@functools.cache
+def _editor_dialog_cls():
+    """Import the companion editor on first use, avoiding a circular import."""
+    from companion_editor_dialog import CompanionEditorDialog
+    return CompanionEditorDialog
@@ -7,6 +7,8 @@ All rights reserved.
 Part of the Kardia AI Companion application.
 """
 import gi
+import queue
+import threading
 from pathlib import Path
 
 gi.require_version("Gtk", "4.0")
@@ -16,32 +18,31 @@ from gi.repository import Gtk, Adw, Gio, GLib
 from companion_data.models import Companion
 from companion_selector import CompanionSelector
 from chat_view import ChatView
-from settings_dialog import SettingsDialog
-from user_profile_dialog import UserProfileDialog
 
 
+@Gtk.Template(filename=str(Path(__file__).with_suffix(".ui")))
 class MainWindow(Adw.ApplicationWindow):
-    """Main GTK4 application window for Kardia."""
+    """Main GTK4 application window for Kardia, laid out in main_window.ui."""
+
+    __gtype_name__ = "MainWindow"
+
+    toast_overlay = Gtk.Template.Child()
+    header_bar = Gtk.Template.Child()
+    switcher = Gtk.Template.Child()
+    stack = Gtk.Template.Child()
 
     def __init__(self, app):
         """Initialize the main window."""
         super().__init__(application=app)
 
-        self.set_title("Kardia")
-        self.set_default_size(1000, 700)
-
         self.app = app
 
-        # Create toast overlay
-        self.toast_overlay = Adw.ToastOverlay()
-
-        # Create header bar widget (but don't set it as titlebar)
-        self.header_bar = Adw.HeaderBar()
-        self._setup_header_bar()
+        # Responses from worker threads, drained by a single idle callback
+        self._ui_queue = queue.SimpleQueue()
+        self._drain_scheduled = threading.Event()
 
-        # Create view stack
-        self.stack = Adw.ViewStack()
-        # Note: ViewStack transitions are handled differently than Gtk.Stack
+        # Settings dialog, built on first use and reused afterwards
+        self._settings_dialog = None
 
         # Create companion selector view
         self.companion_selector = CompanionSelector(self)
@@ -55,50 +56,21 @@ class MainWindow(Adw.ApplicationWindow):
         self.chat_view = ChatView(self)
         self.stack.add_titled(self.chat_view, "chat", "Chat")
 
-        # Create switcher for navigation
-        self.switcher = Adw.ViewSwitcher()
-        self.switcher.set_stack(self.stack)
-        self.switcher.set_policy(Adw.ViewSwitcherPolicy.NARROW)
-
-        # Main box
-        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
-        box.append(self.header_bar)
-        box.append(self.switcher)
-        box.append(self.stack)
-
-        # Set toast overlay content
-        self.toast_overlay.set_child(box)
-        self.set_content(self.toast_overlay)
-
         # Load last companion if available
         self._load_last_companion()
 
-    def _setup_header_bar(self):
-        """Set up the header bar."""
-        # User profile button
-        profile_button = Gtk.Button(label="Your Profile")
-        profile_button.set_icon_name("avatar-default-symbolic")
-        profile_button.connect("clicked", self._on_profile_clicked)
-
-        self.header_bar.pack_end(profile_button)
-
-        # Settings button
-        settings_button = Gtk.Button()
-        settings_button.set_icon_name("emblem-system-symbolic")
-        settings_button.set_tooltip_text("Settings")
-        settings_button.connect("clicked", self._on_settings_clicked)
-
-        self.header_bar.pack_end(settings_button)
-
+    @Gtk.Template.Callback()
     def _on_settings_clicked(self, button):
         """Handle settings button click."""
-        from settings_dialog import SettingsDialog
-        dialog = SettingsDialog(self, self.app)
-        dialog.present()
+        if self._settings_dialog is None:
+            from settings_dialog import SettingsDialog
+            self._settings_dialog = SettingsDialog(self, self.app)
+        self._settings_dialog.present()
 
         # Reload AI backend after settings change
         self.app.reload_backend()
 
+    @Gtk.Template.Callback()
     def _on_profile_clicked(self, button):
         """Handle user profile button click."""
         from user_profile_dialog import UserProfileDialog
@@ -125,8 +97,8 @@ class MainWindow(Adw.ApplicationWindow):
         self.chat_view.set_companion(companion)
 
         # Load conversation history
-        messages = self.app.get_companion_history()
-        self.chat_view.load_messages(messages)
+        messages = self.app.get_companion_history(limit=self.chat_view.HISTORY_PAGE_SIZE)
+        self.chat_view.load_messages_async(messages)
 
         # Switch to chat view
         self.stack.set_visible_child_name("chat")
@@ -141,6 +113,21 @@ class MainWindow(Adw.ApplicationWindow):
 
         # Get AI response
         def on_response(response: str):
-            GLib.idle_add(self.chat_view.show_companion_message, response)
+            self._ui_queue.put(response)
+            if not self._drain_scheduled.is_set():
+                self._drain_scheduled.set()
+                GLib.idle_add(self._drain_ui_queue)
 
         self.app.send_message(message, on_response)
+
+    def _drain_ui_queue(self):
+        """Show every queued companion response in one main-loop pass."""
+        # Clear first so a response queued while draining re-arms the callback
+        self._drain_scheduled.clear()
+        while True:
+            try:
+                response = self._ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            self.chat_view.show_companion_message(response)
+        return False
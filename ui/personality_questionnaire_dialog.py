@@ -7,7 +7,10 @@ Copyright (c) 2025 Hanna Lovvold
 All rights reserved.
 """
 import gi
+import queue
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Dict, Optional, Callable
 
 gi.require_version("Gtk", "4.0")
@@ -22,9 +25,60 @@ from personality_questionnaire import (
     get_all_questions
 )
 
+# Profile generation is I/O-bound; a small shared pool queues requests
+# instead of starting a thread per click. Two workers so a reopened dialog
+# does not wait behind a request still winding down from a closed one.
+_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="kardia-ai")
+
+
+class _GenerationCancelled(Exception):
+    """Raised from the stream callback to end a closed dialog's request."""
+
+# Parsed (attributes, text) for static markup, keyed by the markup string
+_MARKUP_CACHE: Dict[str, tuple] = {}
+
+
+def _apply_markup(label: Gtk.Label, markup: str):
+    """Set static markup on a label, parsing each distinct string only once."""
+    cached = _MARKUP_CACHE.get(markup)
+    if cached is None:
+        # Older PyGObject also returns the success flag first
+        attrs, text, _accel = Pango.parse_markup(markup, -1, "\0")[-3:]
+        cached = _MARKUP_CACHE[markup] = (attrs, text)
+    label.set_text(cached[1])
+    label.set_attributes(cached[0])
+
+
+# Preview text is static, so build its (text, tag) segments once at import
+# rather than per dialog. One inner tuple per category.
+_PREVIEW_SEGMENTS = tuple(
+    (
+        (category, "category"),
+        (f" ({len(questions)} questions)\n", None),
+        *((f"    {num}. {question}\n", "question") for num, question in questions[:2]),
+        *(((f"    ... and {len(questions) - 2} more questions\n", "more"),)
+          if len(questions) > 2 else ()),
+        ("\n", None),
+    )
+    for category, questions in PERSONALITY_QUESTIONS.items()
+)
+
 
+@Gtk.Template(filename=str(Path(__file__).with_suffix(".ui")))
 class PersonalityQuestionnaireDialog(Adw.Window):
-    """Dialog for generating and viewing personality questionnaire responses."""
+    """Dialog for generating and viewing personality questionnaire responses.
+
+    The static layout lives in personality_questionnaire_dialog.ui.
+    """
+
+    __gtype_name__ = "PersonalityQuestionnaireDialog"
+
+    desc_label = Gtk.Template.Child()
+    content_box = Gtk.Template.Child()
+    progress_bar = Gtk.Template.Child()
+    status_label = Gtk.Template.Child()
+    generate_button = Gtk.Template.Child()
+    apply_button = Gtk.Template.Child()
 
     def __init__(self, parent, ai_backend, companion_data: Dict, callback: Callable):
         """Initialize the questionnaire dialog.
@@ -36,95 +90,32 @@ class PersonalityQuestionnaireDialog(Adw.Window):
             callback: Function to call with generated personality text
         """
         super().__init__()
-        self.set_default_size(700, 800)
         self.set_title(f"Personality Profile - {companion_data.get('name', 'Companion')}")
-        self.set_modal(True)
         self.set_transient_for(parent)
 
         self.ai_backend = ai_backend
         self.companion_data = companion_data
         self.callback = callback
         self.generated_answers = {}
+        self._formatted = ""
         self.is_generating = False
+        self._pulse_id = 0
+        self._cancelled = threading.Event()
+        self._future = None
+
+        # Streamed response chunks, drained into _stream_view by one idle callback
+        self._stream_view = None
+        self._stream_queue = queue.SimpleQueue()
+        self._stream_drain_scheduled = threading.Event()
 
         self._create_content()
 
     def _create_content(self):
-        """Create the dialog content."""
-        main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
-        main_box.set_margin_start(20)
-        main_box.set_margin_end(20)
-        main_box.set_margin_top(20)
-        main_box.set_margin_bottom(20)
-
-        # Header with description
-        header_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=5)
-        title_label = Gtk.Label()
-        title_label.set_markup(f"<b><big>Personality Questionnaire</big></b>")
-        title_label.set_halign(Gtk.Align.START)
-        header_box.append(title_label)
-
-        desc_label = Gtk.Label()
-        desc_label.set_markup(
+        """Fill in the dialog content that depends on the companion."""
+        self.desc_label.set_markup(
             f"Generate a detailed personality profile for <b>{self.companion_data.get('name', 'Companion')}</b> "
             "based on their traits. The AI will answer 50 questions in character."
         )
-        desc_label.set_halign(Gtk.Align.START)
-        desc_label.set_wrap(True)
-        desc_label.set_size_request(650, -1)
-        header_box.append(desc_label)
-
-        main_box.append(header_box)
-
-        # Scrolled window for questions/answers
-        scroll = Gtk.ScrolledWindow()
-        scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
-        scroll.set_vexpand(True)
-
-        self.content_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=15)
-        self.content_box.set_margin_start(10)
-        self.content_box.set_margin_end(10)
-        self.content_box.set_margin_top(10)
-        self.content_box.set_margin_bottom(10)
-        scroll.set_child(self.content_box)
-
-        main_box.append(scroll)
-
-        # Progress bar (hidden initially)
-        self.progress_bar = Gtk.ProgressBar()
-        self.progress_bar.set_show_text(True)
-        self.progress_bar.set_text("Generating personality profile...")
-        self.progress_bar.set_visible(False)
-        main_box.append(self.progress_bar)
-
-        # Status label
-        self.status_label = Gtk.Label()
-        self.status_label.set_wrap(True)
-        self.status_label.set_visible(False)
-        main_box.append(self.status_label)
-
-        # Button box
-        button_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
-        button_box.set_margin_top(10)
-        button_box.set_halign(Gtk.Align.END)
-
-        self.generate_button = Gtk.Button(label="Generate Profile")
-        self.generate_button.add_css_class("suggested-action")
-        self.generate_button.connect("clicked", self._on_generate_clicked)
-        button_box.append(self.generate_button)
-
-        self.apply_button = Gtk.Button(label="Apply to Personality")
-        self.apply_button.add_css_class("suggested-action")
-        self.apply_button.set_sensitive(False)
-        self.apply_button.connect("clicked", self._on_apply_clicked)
-        button_box.append(self.apply_button)
-
-        cancel_button = Gtk.Button(label="Cancel")
-        cancel_button.connect("clicked", lambda _: self.close())
-        button_box.append(cancel_button)
-
-        main_box.append(button_box)
-        self.set_content(main_box)
 
         # Show questions preview
         self._show_questions_preview()
@@ -133,7 +124,8 @@ class PersonalityQuestionnaireDialog(Adw.Window):
         """Show preview of questions in the content area."""
         # Add a note about the questions
         info_label = Gtk.Label()
-        info_label.set_markup(
+        _apply_markup(
+            info_label,
             "<i>The questionnaire covers 8 categories with 50 questions total. "
             "Click 'Generate Profile' to have the AI answer these questions in character.</i>"
         )
@@ -141,33 +133,50 @@ class PersonalityQuestionnaireDialog(Adw.Window):
         info_label.set_margin_bottom(10)
         self.content_box.append(info_label)
 
-        # Show categories
-        for category, questions in PERSONALITY_QUESTIONS.items():
-            category_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=5)
-
-            category_label = Gtk.Label()
-            category_label.set_markup(f"<b>{category}</b> ({len(questions)} questions)")
-            category_label.set_halign(Gtk.Align.START)
-            category_label.set_margin_top(10)
-            category_box.append(category_label)
-
-            # Show first 2 questions as preview
-            for i, (num, question) in enumerate(questions[:2]):
-                q_label = Gtk.Label()
-                q_label.set_markup(f"  <small>{num}. {question}</small>")
-                q_label.set_halign(Gtk.Align.START)
-                q_label.set_ellipsize(Pango.EllipsizeMode.END)
-                q_label.set_size_request(600, -1)
-                category_box.append(q_label)
-
-            if len(questions) > 2:
-                more_label = Gtk.Label()
-                more_label.set_markup(f"  <small><i>... and {len(questions) - 2} more questions</i></small>")
-                more_label.set_halign(Gtk.Align.START)
-                category_box.append(more_label)
-
-            self.content_box.append(category_box)
+        # Show categories in a single text view rather than a label per line
+        text_view = Gtk.TextView()
+        text_view.set_editable(False)
+        text_view.set_cursor_visible(False)
+        text_view.set_wrap_mode(Gtk.WrapMode.WORD)
+
+        buffer = text_view.get_buffer()
+        buffer.create_tag("category", weight=Pango.Weight.BOLD)
+        buffer.create_tag("question", scale=0.85)
+        buffer.create_tag("more", scale=0.85, style=Pango.Style.ITALIC)
+        self.content_box.append(text_view)
+
+        # Fill one category per idle iteration so the dialog paints first
+        GLib.idle_add(
+            self._append_next_category, text_view, iter(_PREVIEW_SEGMENTS),
+            priority=GLib.PRIORITY_DEFAULT_IDLE
+        )
+
+    def _append_next_category(self, text_view, categories) -> bool:
+        """Append one preview category; returns True while more remain."""
+        # Generation replaced the preview before it finished filling
+        if text_view.get_parent() is None:
+            return False
 
+        segments = next(categories, None)
+        if segments is None:
+            return False
+
+        buffer = text_view.get_buffer()
+        end = buffer.get_end_iter()
+        for text, tag in segments:
+            if tag:
+                buffer.insert_with_tags_by_name(end, text, tag)
+            else:
+                buffer.insert(end, text)
+        return True
+
+    def _clear_content(self):
+        """Remove every child from the content box."""
+        # Iterating the box while removing skips children, so pop from the front
+        while (child := self.content_box.get_first_child()) is not None:
+            self.content_box.remove(child)
+
+    @Gtk.Template.Callback()
     def _on_generate_clicked(self, button):
         """Handle generate button click."""
         if self.is_generating:
@@ -176,18 +185,35 @@ class PersonalityQuestionnaireDialog(Adw.Window):
         self.is_generating = True
         self.generate_button.set_sensitive(False)
         self.progress_bar.set_visible(True)
-        self.progress_bar.pulse()
-        self.status_label.set_markup("<i>Generating personality profile... This may take a moment.</i>")
+        self._start_pulse()
+        _apply_markup(self.status_label, "<i>Generating personality profile... This may take a moment.</i>")
         self.status_label.set_visible(True)
 
         # Clear content box and show loading
-        for child in self.content_box:
-            self.content_box.remove(child)
+        self._clear_content()
 
         loading_label = Gtk.Label()
-        loading_label.set_markup("<big><b>Generating Personality Profile...</b></big>\n\nPlease wait...")
+        _apply_markup(loading_label, "<big><b>Generating Personality Profile...</b></big>\n\nPlease wait...")
         self.content_box.append(loading_label)
 
+        # Raw response text as it streams in, replaced by the parsed profile
+        self._stream_view = Gtk.TextView()
+        self._stream_view.set_editable(False)
+        self._stream_view.set_cursor_visible(False)
+        self._stream_view.set_wrap_mode(Gtk.WrapMode.WORD)
+        self.content_box.append(self._stream_view)
+
+        cancelled = self._cancelled
+
+        def on_chunk(chunk: str):
+            if cancelled.is_set():
+                # The backends stop reading the stream when the callback raises
+                raise _GenerationCancelled()
+            self._stream_queue.put(chunk)
+            if not self._stream_drain_scheduled.is_set():
+                self._stream_drain_scheduled.set()
+                GLib.idle_add(self._drain_stream_text)
+
         # Generate in background thread
         def generate_in_background():
             try:
@@ -198,32 +224,90 @@ class PersonalityQuestionnaireDialog(Adw.Window):
                 response = self.ai_backend.generate_response(
                     messages=[{"role": "user", "content": prompt}],
                     system_prompt="You are a creative writing assistant helping design an AI companion's personality. Answer naturally and thoughtfully in character.",
-                    stream=False
+                    stream=True,
+                    callback=on_chunk
                 )
+                if cancelled.is_set():
+                    return
 
                 # Parse response
                 self.generated_answers = parse_ai_response(response)
+                self._formatted = format_qa_for_personality(
+                    self.generated_answers,
+                    self.companion_data.get('name', 'Companion')
+                )
 
-                # Update UI on main thread
-                GLib.idle_add(self._show_generated_results)
+                # Update UI on main thread, unless the dialog was closed
+                if not self._cancelled.is_set():
+                    GLib.idle_add(self._show_generated_results)
 
             except Exception as e:
-                GLib.idle_add(self._show_error, str(e))
+                if not self._cancelled.is_set():
+                    GLib.idle_add(self._show_error, str(e))
+
+        self._future = _EXECUTOR.submit(generate_in_background)
+
+    @Gtk.Template.Callback()
+    def _on_close_request(self, window) -> bool:
+        """Stop pending UI work from the generation thread."""
+        self._cancelled.set()
+        if self._future is not None:
+            # Drops the job if it is still queued behind another dialog's
+            self._future.cancel()
+        self._stop_pulse()
+        return False
+
+    def _drain_stream_text(self):
+        """Append every queued response chunk in a single buffer insert."""
+        # Clear first so a chunk queued while draining re-arms the callback
+        self._stream_drain_scheduled.clear()
+        chunks = []
+        while True:
+            try:
+                chunks.append(self._stream_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        if self._cancelled.is_set():
+            return False
+
+        # Results or an error may already have replaced the stream view
+        if self._stream_view is not None and chunks:
+            buffer = self._stream_view.get_buffer()
+            buffer.insert(buffer.get_end_iter(), "".join(chunks))
+        return False
+
+    def _start_pulse(self):
+        """Animate the progress bar until generation finishes."""
+        if not self._pulse_id:
+            self._pulse_id = GLib.timeout_add(150, self._on_pulse_tick)
+
+    def _on_pulse_tick(self) -> bool:
+        """Pulse the progress bar; keeps the timeout running."""
+        self.progress_bar.pulse()
+        return True
 
-        thread = threading.Thread(target=generate_in_background, daemon=True)
-        thread.start()
+    def _stop_pulse(self):
+        """Stop the progress bar animation, if running."""
+        if self._pulse_id:
+            GLib.source_remove(self._pulse_id)
+            self._pulse_id = 0
 
     def _show_generated_results(self):
         """Show the generated questionnaire results."""
+        if self._cancelled.is_set():
+            return False
+
         self.is_generating = False
+        self._stop_pulse()
+        self._stream_view = None
         self.progress_bar.set_visible(False)
         self.status_label.set_visible(False)
         self.apply_button.set_sensitive(True)
         self.generate_button.set_sensitive(True)
 
         # Clear content box
-        for child in self.content_box:
-            self.content_box.remove(child)
+        self._clear_content()
 
         # Add header
         header_label = Gtk.Label()
@@ -231,12 +315,9 @@ class PersonalityQuestionnaireDialog(Adw.Window):
         header_label.set_margin_bottom(15)
         self.content_box.append(header_label)
 
-        # Create scrollable text view for the full profile
-        scroll = Gtk.ScrolledWindow()
-        scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
-        scroll.set_vexpand(True)
-
+        # Text view for the full profile; the outer scroller already scrolls it
         text_view = Gtk.TextView()
+        text_view.set_vexpand(True)
         text_view.set_editable(False)
         text_view.set_wrap_mode(Gtk.WrapMode.WORD)
         text_view.set_left_margin(10)
@@ -245,45 +326,38 @@ class PersonalityQuestionnaireDialog(Adw.Window):
         text_view.set_bottom_margin(10)
 
         buffer = text_view.get_buffer()
-        formatted_text = format_qa_for_personality(self.generated_answers, self.companion_data.get('name', 'Companion'))
-        buffer.set_text(formatted_text)
+        buffer.set_text(self._formatted)
 
-        # Create a tag for bold text
-        bold_tag = buffer.create_tag("bold", weight=Pango.Weight.BOLD)
-        # Create a tag for headers
-        header_tag = buffer.create_tag("header", size=15 * Pango.SCALE, weight=Pango.Weight.BOLD)
-
-        scroll.set_child(text_view)
-        self.content_box.append(scroll)
+        self.content_box.append(text_view)
 
     def _show_error(self, error_message: str):
         """Show error message."""
+        if self._cancelled.is_set():
+            return False
+
         self.is_generating = False
+        self._stop_pulse()
+        self._stream_view = None
         self.progress_bar.set_visible(False)
         self.generate_button.set_sensitive(True)
 
         # Clear content box
-        for child in self.content_box:
-            self.content_box.remove(child)
+        self._clear_content()
 
         error_label = Gtk.Label()
         error_label.set_markup(f"<b><span foreground='red'>Error generating profile:</span></b>\n\n{error_message}")
         error_label.set_wrap(True)
         self.content_box.append(error_label)
 
+    @Gtk.Template.Callback()
     def _on_apply_clicked(self, button):
         """Handle apply button click - add profile to personality."""
         if not self.generated_answers:
             return
 
-        formatted_text = format_qa_for_personality(
-            self.generated_answers,
-            self.companion_data.get('name', 'Companion')
-        )
-
-        # Call the callback with the formatted text
+        # Call the callback with the text formatted by the worker thread
         if self.callback:
-            self.callback(formatted_text)
+            self.callback(self._formatted)
 
         self.close()
 
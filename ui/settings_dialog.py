@@ -7,30 +7,210 @@ All rights reserved.
 Part of the Kardia AI Companion application.
 """
 import gi
+import itertools
+import os
+import threading
+import time
 from datetime import datetime
-from pathlib import Path
 
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
-from gi.repository import Gtk, Adw, GLib, Pango
+from gi.repository import Gtk, Adw, Gio, GLib, Pango
+
+# Backend ids in the order of the backend combo row, with their display names
+BACKENDS = ("ollama", "openai", "groq", "deepseek", "together", "openrouter", "custom")
+BACKEND_NAMES = ("Ollama", "OpenAI", "Groq", "DeepSeek", "Together AI", "OpenRouter", "Custom")
+BACKEND_INDEX = {backend: index for index, backend in enumerate(BACKENDS)}
+
+# Export formats in the order of the export format combo row, with their display names
+EXPORT_FORMATS = ("json", "txt")
+EXPORT_FORMAT_NAMES = ("JSON", "Readable Text")
+
+DEFAULT_API_PARAMS = '{"thinking": {"type": "enabled", "clear_thinking": "true"}, "do_sample": "true"}'
+
+# Quick setup providers: (name, url, model, price)
+PROVIDERS = (
+    ("OpenAI (gpt-3.5-turbo)", "https://api.openai.com/v1", "gpt-3.5-turbo", "$"),
+    ("Groq (llama-3.3-70b)", "https://api.groq.com/openai/v1", "llama-3.3-70b-versatile", "FREE"),
+    ("DeepSeek (deepseek-chat)", "https://api.deepseek.com/v1", "deepseek-chat", "FREE"),
+    ("Together (Llama 3 70B)", "https://api.together.xyz/v1", "meta-llama/Meta-Llama-3.1-70B-Instruct-Turbo", "FREE"),
+)
+
+# Importance ratings (0-5) rendered as star strings, indexed by importance
+_IMPORTANCE_STARS = tuple("★" * n + "☆" * (5 - n) for n in range(6))
+
+
+class MemoryRow(Gtk.ListBoxRow):
+    """Reusable list row showing one memory."""
+
+    def __init__(self, on_delete):
+        """Create the row; on_delete(button, memory_id) handles its delete button."""
+        super().__init__()
+        self.set_selectable(False)
+        self.memory_id = None
+
+        box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
+        box.set_margin_start(10)
+        box.set_margin_end(10)
+        box.set_margin_top(5)
+        box.set_margin_bottom(5)
+
+        # Type badge
+        self.type_label = Gtk.Label()
+        self.type_label.add_css_class("tag")
+        box.append(self.type_label)
+
+        # Content
+        content_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=3)
+        content_box.set_hexpand(True)
+
+        self.content_label = Gtk.Label()
+        self.content_label.set_halign(Gtk.Align.START)
+        self.content_label.set_ellipsize(Pango.EllipsizeMode.END)
+        content_box.append(self.content_label)
+
+        # Details
+        self.detail_label = Gtk.Label()
+        self.detail_label.set_halign(Gtk.Align.START)
+        self.detail_label.add_css_class("dim-label")
+        content_box.append(self.detail_label)
+
+        box.append(content_box)
+
+        # Shared indicator
+        self.specific_indicator = Gtk.Label(label="🔒")
+        self.specific_indicator.set_tooltip_text("Companion-specific memory")
+        box.append(self.specific_indicator)
+
+        # Importance indicator
+        self.importance_label = Gtk.Label()
+        box.append(self.importance_label)
+
+        # Delete button
+        delete_button = Gtk.Button()
+        delete_button.set_icon_name("edit-delete-symbolic")
+        delete_button.add_css_class("destructive-action")
+        delete_button.connect("clicked", lambda button: on_delete(button, self.memory_id))
+        box.append(delete_button)
+
+        self.set_child(box)
+
+    def bind(self, memory):
+        """Show a memory in this row."""
+        self.memory_id = memory.id
+        self.type_label.set_label(memory.memory_type.replace("_", " ").title())
+
+        content_text = memory.content[:100] + "..." if len(memory.content) > 100 else memory.content
+        self.content_label.set_label(content_text)
+
+        detail_parts = []
+        if memory.key and memory.value:
+            detail_parts.append(f"{memory.key}: {memory.value}")
+
+        if not memory.is_shared:
+            detail_parts.append(f"Companion: {memory.companion_id}")
+
+        if detail_parts:
+            details = GLib.markup_escape_text(" | ".join(detail_parts))
+            self.detail_label.set_markup(f"<small>{details}</small>")
+        self.detail_label.set_visible(bool(detail_parts))
+
+        self.specific_indicator.set_visible(not memory.is_shared)
+        self.importance_label.set_label(_IMPORTANCE_STARS[max(0, min(5, memory.importance))])
 
 
 class SettingsDialog(Adw.PreferencesWindow):
     """Settings dialog (GTK4)."""
 
+    # Memory rows added per main-loop iteration when filling a list
+    ROW_CHUNK_SIZE = 8
+    # Most memory rows kept for reuse between refreshes
+    ROW_POOL_SIZE = 32
+    # Seconds within which a repeated refresh of an unchanged store is a no-op
+    REFRESH_DEBOUNCE = 0.25
+
     def __init__(self, parent, app):
         """Initialize settings dialog."""
         super().__init__()
         self.set_transient_for(parent)
         self.set_default_size(700, 600)
         self.set_title("Settings")
+        # The dialog is kept and re-presented, so hide rather than destroy it
+        self.set_hide_on_close(True)
 
         self.app = app
 
-        # Create pages
+        # Text entry edits are written to config in one batch after typing pauses
+        self._pending_writes = {}
+        self._write_source = 0
+
+        # Memory store revision the memory page last showed, and when
+        self._memories_revision = -1
+        self._memories_refreshed_at = 0.0
+
+        # Widgets of lazily built pages; None until the page is first shown
+        self.api_status_label = None
+        self.memories_scroll = None
+        self.memories_list = None
+        self._memory_action_buttons = ()
+        self._row_pool = []
+        self.connect("close-request", self._on_close_request)
+        self.connect("show", self._on_show)
+
+        # Create pages; all but the default page are filled in when first shown
+        self._lazy_pages = {}
         self._create_ai_backend_page()
-        self._create_api_page()
-        self._create_memory_page()
+        self._add_lazy_page("API Server", "network-wired-symbolic", self._create_api_page)
+        self._add_lazy_page("Memory", "document-open-recent-symbolic", self._create_memory_page)
+        self.connect("notify::visible-page", self._on_visible_page_changed)
+
+    def _queue_write(self, key, value):
+        """Write a config value once edits have paused."""
+        self._pending_writes[key] = value
+        if self._write_source:
+            GLib.source_remove(self._write_source)
+        self._write_source = GLib.timeout_add(200, self._on_write_timeout)
+
+    def _on_write_timeout(self):
+        """Flush queued config writes once typing pauses."""
+        self._write_source = 0
+        self._flush_writes()
+        return GLib.SOURCE_REMOVE
+
+    def _flush_writes(self):
+        """Write any queued config values now."""
+        if self._write_source:
+            GLib.source_remove(self._write_source)
+            self._write_source = 0
+        if self._pending_writes:
+            self.app.config.update(self._pending_writes)
+            self._pending_writes = {}
+
+    def _on_close_request(self, window):
+        """Write pending edits before the dialog closes."""
+        self._flush_writes()
+        return False
+
+    def _on_show(self, window):
+        """Bring already built pages up to date when the dialog is shown again."""
+        if self.api_status_label is not None:
+            self._on_test_api(None)
+        if self.memories_scroll is not None:
+            self._on_refresh_memories(None)
+
+    def _add_lazy_page(self, title, icon_name, build):
+        """Add an empty page whose content is built by build(page) on first view."""
+        page = Adw.PreferencesPage()
+        page.set_title(title)
+        page.set_icon_name(icon_name)
+        self._lazy_pages[page] = build
+        self.add(page)
+
+    def _on_visible_page_changed(self, window, param):
+        """Build a lazily created page the first time it is shown."""
+        build = self._lazy_pages.pop(self.get_visible_page(), None)
+        if build:
+            build(self.get_visible_page())
 
     def _create_ai_backend_page(self):
         """Create AI backend settings page."""
@@ -45,18 +225,11 @@ class SettingsDialog(Adw.PreferencesWindow):
         # Backend type dropdown
         row = Adw.ComboRow()
         row.set_title("Backend")
-        backend_list = Gtk.StringList()
-        for backend in ["Ollama", "OpenAI", "Groq", "DeepSeek", "Together AI", "OpenRouter", "Custom"]:
-            backend_list.append(backend)
-        row.set_model(backend_list)
+        row.set_model(Gtk.StringList.new(BACKEND_NAMES))
 
         # Set current backend
         current_backend = self.app.config.get("ai_backend", "ollama")
-        backend_map = {
-            "ollama": 0, "openai": 1, "groq": 2, "deepseek": 3,
-            "together": 4, "openrouter": 5, "custom": 6
-        }
-        row.set_selected(backend_map.get(current_backend.lower(), 0))
+        row.set_selected(BACKEND_INDEX.get(current_backend.lower(), 0))
 
         row.connect("notify::selected", self._on_backend_changed)
         group.add(row)
@@ -106,8 +279,7 @@ class SettingsDialog(Adw.PreferencesWindow):
         # Additional parameters (JSON format)
         self.api_params_row = Adw.EntryRow()
         self.api_params_row.set_title("Additional Parameters (JSON)")
-        default_params = '{"thinking": {"type": "enabled", "clear_thinking": "true"}, "do_sample": "true"}'
-        self.api_params_row.set_text(self.app.config.get("api_params", default_params))
+        self.api_params_row.set_text(self.app.config.get("api_params", DEFAULT_API_PARAMS))
         self.api_params_row.connect("changed", self._on_api_params_changed)
         self.api_group.add(self.api_params_row)
 
@@ -130,24 +302,17 @@ class SettingsDialog(Adw.PreferencesWindow):
         quick_setup_group.set_title("Quick Setup")
 
         # Provider buttons
-        providers = [
-            ("OpenAI (gpt-3.5-turbo)", "https://api.openai.com/v1", "gpt-3.5-turbo", "$"),
-            ("Groq (llama-3.3-70b)", "https://api.groq.com/openai/v1", "llama-3.3-70b-versatile", "FREE"),
-            ("DeepSeek (deepseek-chat)", "https://api.deepseek.com/v1", "deepseek-chat", "FREE"),
-            ("Together (Llama 3 70B)", "https://api.together.xyz/v1", "meta-llama/Meta-Llama-3.1-70B-Instruct-Turbo", "FREE"),
-        ]
-
-        for name, url, model, price in providers:
+        for name, url, model, price in PROVIDERS:
             provider_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
 
-            name_label = Gtk.Label()
-            name_label.set_markup(f"<b>{name}</b>")
+            name_label = Gtk.Label(label=name)
+            name_label.add_css_class("heading")
             name_label.set_halign(Gtk.Align.START)
             name_label.set_hexpand(True)
             provider_box.append(name_label)
 
-            price_label = Gtk.Label()
-            price_label.set_markup(f'<span foreground="{"green" if price == "FREE" else "orange"}">{price}</span>')
+            price_label = Gtk.Label(label=price)
+            price_label.add_css_class("success" if price == "FREE" else "warning")
             provider_box.append(price_label)
 
             use_button = Gtk.Button(label="Use")
@@ -164,11 +329,8 @@ class SettingsDialog(Adw.PreferencesWindow):
 
         self.add(page)
 
-    def _create_api_page(self):
-        """Create REST API settings page."""
-        page = Adw.PreferencesPage()
-        page.set_title("API Server")
-        page.set_icon_name("network-wired-symbolic")
+    def _create_api_page(self, page):
+        """Fill in the REST API settings page."""
 
         # Info group
         info_group = Adw.PreferencesGroup()
@@ -256,8 +418,6 @@ class SettingsDialog(Adw.PreferencesWindow):
 
         page.add(endpoints_group)
 
-        self.add(page)
-
         # Check status initially
         self._on_test_api(None)
 
@@ -265,17 +425,18 @@ class SettingsDialog(Adw.PreferencesWindow):
         """Handle API port change."""
         try:
             port = int(row.get_text())
-            self.app.config.set("api_server_port", port)
+            self._queue_write("api_server_port", port)
         except ValueError:
             pass
 
     def _on_api_token_changed(self, row):
         """Handle API token change."""
-        self.app.config.set("api_bearer_token", row.get_text())
+        self._queue_write("api_bearer_token", row.get_text())
 
     def _on_test_api(self, button):
         """Test API connection."""
-        import os
+        # Report on the values as typed, not as last written
+        self._flush_writes()
 
         # Check if token is configured
         token = os.getenv("API_BEARER_TOKEN") or self.app.config.get("api_bearer_token", "kardia-api-key")
@@ -298,11 +459,8 @@ class SettingsDialog(Adw.PreferencesWindow):
 
         self.api_status_label.set_markup("\n".join(messages))
 
-    def _create_memory_page(self):
-        """Create memory settings page."""
-        page = Adw.PreferencesPage()
-        page.set_title("Memory")
-        page.set_icon_name("document-open-recent-symbolic")
+    def _create_memory_page(self, page):
+        """Fill in the memory settings page."""
 
         # Memory stats group
         stats_group = Adw.PreferencesGroup()
@@ -331,9 +489,7 @@ class SettingsDialog(Adw.PreferencesWindow):
         memories_scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
         memories_scroll.set_min_content_height(300)
 
-        self.memories_list = Gtk.ListBox()
-        self.memories_list.set_selection_mode(Gtk.SelectionMode.NONE)
-        memories_scroll.set_child(self.memories_list)
+        self.memories_scroll = memories_scroll
 
         memories_group.add(memories_scroll)
         page.add(memories_group)
@@ -369,6 +525,9 @@ class SettingsDialog(Adw.PreferencesWindow):
         clear_button.connect("clicked", self._on_clear_memories)
         actions_group.add(clear_button)
 
+        # Disabled while an import or clear runs on a worker thread
+        self._memory_action_buttons = (refresh_button, import_button, clear_button)
+
         page.add(actions_group)
 
         # Auto-save toggle (move to bottom)
@@ -383,8 +542,6 @@ class SettingsDialog(Adw.PreferencesWindow):
 
         page.add(settings_group)
 
-        self.add(page)
-
         # Load initial memories
         self._on_refresh_memories(None)
 
@@ -401,9 +558,7 @@ class SettingsDialog(Adw.PreferencesWindow):
 
     def _on_backend_changed(self, row, param):
         """Handle backend type change."""
-        backends = ["ollama", "openai", "groq", "deepseek", "together", "openrouter", "custom"]
-        selected = row.get_selected()
-        backend = backends[selected]
+        backend = BACKENDS[row.get_selected()]
         self.app.config.set("ai_backend", backend)
         self._update_backend_settings(backend)
 
@@ -414,47 +569,53 @@ class SettingsDialog(Adw.PreferencesWindow):
 
     def _on_ollama_url_changed(self, row):
         """Handle Ollama URL change."""
-        self.app.config.set("ollama_url", row.get_text())
+        self._queue_write("ollama_url", row.get_text())
 
     def _on_ollama_model_changed(self, row):
         """Handle Ollama model change."""
-        self.app.config.set("ollama_model", row.get_text())
+        self._queue_write("ollama_model", row.get_text())
 
     def _on_api_key_changed(self, row):
         """Handle API key change."""
-        self.app.config.set("api_key", row.get_text())
+        self._queue_write("api_key", row.get_text())
 
     def _on_api_url_changed(self, row):
         """Handle API URL change."""
-        self.app.config.set("api_url", row.get_text())
+        self._queue_write("api_url", row.get_text())
 
     def _on_api_model_changed(self, row):
         """Handle API model change."""
-        self.app.config.set("api_model", row.get_text())
+        self._queue_write("api_model", row.get_text())
 
     def _on_api_params_changed(self, row):
         """Handle API additional parameters change."""
-        self.app.config.set("api_params", row.get_text())
+        self._queue_write("api_params", row.get_text())
 
     def _on_auto_save_toggled(self, row, param):
         """Handle auto-save toggle."""
         self.app.config.set("auto_save_enabled", row.get_active())
 
     def _on_refresh_memories(self, button):
-        """Refresh the memories list."""
-        # Clear list
-        child = self.memories_list.get_first_child()
-        while child:
-            next_child = child.get_next_sibling()
-            self.memories_list.remove(child)
-            child = next_child
-
-        # Get memories
+        """Refresh the memories list.
+
+        Internal refreshes (button is None) are skipped when the store is unchanged;
+        the Refresh button reloads unless the list was refreshed a moment ago.
+        """
+        revision = self.app.memory_store.revision
+        now = time.monotonic()
+        if revision == self._memories_revision and (
+            button is None or now - self._memories_refreshed_at < self.REFRESH_DEBOUNCE
+        ):
+            return
+        self._memories_refreshed_at = now
+
+        # Get memories; this marks them accessed, so record the revision after it
         memories = self.app.memory_store.get_recent_memories(limit=20)
+        self._memories_revision = self.app.memory_store.revision
 
         # Update stats
         stats = self.app.memory_store.get_stats()
-        shared_count = len(self.app.memory_store.get_shared_memories())
+        shared_count = stats['shared_count']
         specific_count = stats['total_memories'] - shared_count
 
         self.memory_stats_label.set_markup(
@@ -464,78 +625,92 @@ class SettingsDialog(Adw.PreferencesWindow):
             f"<b>Important (3+):</b> {stats['important_count']}"
         )
 
-        # Add memories to list
-        for memory in memories:
-            row = self._create_memory_row(memory)
-            self.memories_list.append(row)
+        # Fill the first rows of a new list while it is detached, swap it in with
+        # one layout pass, then add the rest from idle callbacks
+        if self.memories_list is not None:
+            self._recycle_memory_rows(self.memories_list)
+        memories_list = Gtk.ListBox()
+        memories_list.set_selection_mode(Gtk.SelectionMode.NONE)
+        pending = iter(memories)
+        more = self._append_memory_rows(memories_list, pending)
+        self.memories_scroll.set_child(memories_list)
+        self.memories_list = memories_list
+        if more:
+            GLib.idle_add(self._append_memory_rows_idle, memories_list, pending)
+
+    def _append_memory_rows(self, listbox, pending) -> bool:
+        """Append the next chunk of memory rows; returns whether more may remain."""
+        count = 0
+        for memory in itertools.islice(pending, self.ROW_CHUNK_SIZE):
+            listbox.append(self._create_memory_row(memory))
+            count += 1
+        return count == self.ROW_CHUNK_SIZE
+
+    def _append_memory_rows_idle(self, listbox, pending):
+        """Idle callback continuing _append_memory_rows for a shown list."""
+        # Stop once a refresh replaced the list or its window was closed
+        root = listbox.get_root()
+        if root is None or not root.get_visible():
+            if listbox is self.memories_list:
+                # Left half-filled; make the next refresh rebuild it
+                self._memories_revision = -1
+            return GLib.SOURCE_REMOVE
+        if self._append_memory_rows(listbox, pending):
+            return GLib.SOURCE_CONTINUE
+        return GLib.SOURCE_REMOVE
 
     def _create_memory_row(self, memory):
-        """Create a row for a memory."""
-        row = Gtk.ListBoxRow()
-        row.set_selectable(False)
-
-        box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
-        box.set_margin_start(10)
-        box.set_margin_end(10)
-        box.set_margin_top(5)
-        box.set_margin_bottom(5)
-
-        # Type badge
-        type_label = Gtk.Label()
-        type_label.set_label(memory.memory_type.replace("_", " ").title())
-        type_label.add_css_class("tag")
-        box.append(type_label)
-
-        # Content
-        content_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=3)
-        content_box.set_hexpand(True)
-
-        content_label = Gtk.Label()
-        content_text = memory.content[:100] + "..." if len(memory.content) > 100 else memory.content
-        content_label.set_label(content_text)
-        content_label.set_halign(Gtk.Align.START)
-        content_label.set_ellipsize(Pango.EllipsizeMode.END)
-        content_box.append(content_label)
-
-        # Details
-        detail_parts = []
-        if memory.key and memory.value:
-            detail_parts.append(f"{memory.key}: {memory.value}")
-
-        if not memory.is_shared:
-            detail_parts.append(f"Companion: {memory.companion_id}")
+        """Get a row showing a memory, reusing a pooled row if there is one."""
+        row = self._row_pool.pop() if self._row_pool else MemoryRow(self._on_delete_memory)
+        row.bind(memory)
+        return row
 
-        if detail_parts:
-            detail_label = Gtk.Label()
-            detail_label.set_markup(f'<small>{" | ".join(detail_parts)}</small>')
-            detail_label.set_halign(Gtk.Align.START)
-            detail_label.add_css_class("dim-label")
-            content_box.append(detail_label)
+    def _recycle_memory_rows(self, listbox):
+        """Move a list's rows into the row pool, up to its size limit.
 
-        box.append(content_box)
+        Rows beyond the limit stay in the list and go with it when it is discarded.
+        """
+        while len(self._row_pool) < self.ROW_POOL_SIZE:
+            row = listbox.get_first_child()
+            if row is None:
+                break
+            listbox.remove(row)
+            self._row_pool.append(row)
 
-        # Shared indicator
-        if not memory.is_shared:
-            specific_indicator = Gtk.Label()
-            specific_indicator.set_label("🔒")
-            specific_indicator.set_tooltip_text("Companion-specific memory")
-            box.append(specific_indicator)
-
-        # Importance indicator
-        importance_label = Gtk.Label()
-        importance_stars = "★" * memory.importance + "☆" * (5 - memory.importance)
-        importance_label.set_label(importance_stars)
-        box.append(importance_label)
+    def _make_modal(self, title, width, height, margin=20):
+        """Create a modal window over this dialog with a vertical content box."""
+        dialog = Adw.Window()
+        dialog.set_default_size(width, height)
+        dialog.set_title(title)
+        dialog.set_modal(True)
+        dialog.set_transient_for(self)
 
-        # Delete button
-        delete_button = Gtk.Button()
-        delete_button.set_icon_name("edit-delete-symbolic")
-        delete_button.add_css_class("destructive-action")
-        delete_button.connect("clicked", self._on_delete_memory, memory.id)
-        box.append(delete_button)
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
+        box.set_margin_start(margin)
+        box.set_margin_end(margin)
+        box.set_margin_top(margin)
+        box.set_margin_bottom(margin)
+        dialog.set_content(box)
+        return dialog, box
 
-        row.set_child(box)
-        return row
+    def _make_confirm(self, heading, body, confirm_label, on_confirm):
+        """Present a Cancel / destructive-confirm message; on_confirm runs if confirmed."""
+        dialog = Adw.MessageDialog()
+        dialog.set_transient_for(self)
+        dialog.set_heading(heading)
+        dialog.set_body(body)
+        dialog.add_response("cancel", "Cancel")
+        dialog.add_response("confirm", confirm_label)
+        dialog.set_response_appearance("confirm", Adw.ResponseAppearance.DESTRUCTIVE)
+        dialog.set_default_response("cancel")
+        dialog.set_close_response("cancel")
+
+        def on_response(_dialog, response):
+            if response == "confirm":
+                on_confirm()
+
+        dialog.connect("response", on_response)
+        dialog.present()
 
     def _on_delete_memory(self, button, memory_id):
         """Handle delete memory."""
@@ -544,17 +719,7 @@ class SettingsDialog(Adw.PreferencesWindow):
 
     def _on_search_memories(self, button):
         """Handle search memories."""
-        dialog = Adw.Window()
-        dialog.set_default_size(500, 200)
-        dialog.set_title("Search Memories")
-        dialog.set_modal(True)
-        dialog.set_transient_for(self)
-
-        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
-        box.set_margin_start(20)
-        box.set_margin_end(20)
-        box.set_margin_top(20)
-        box.set_margin_bottom(20)
+        dialog, box = self._make_modal("Search Memories", 500, 200)
 
         entry = Gtk.Entry()
         entry.set_placeholder_text("Enter search term...")
@@ -573,7 +738,6 @@ class SettingsDialog(Adw.PreferencesWindow):
         button_box.append(search_button)
 
         box.append(button_box)
-        dialog.set_content(box)
         dialog.present()
 
         # Also search on Enter key
@@ -590,17 +754,7 @@ class SettingsDialog(Adw.PreferencesWindow):
         """Show memory search results."""
         memories = self.app.memory_store.search_memories(query)
 
-        results_dialog = Adw.Window()
-        results_dialog.set_default_size(600, 400)
-        results_dialog.set_title(f"Search Results: {query}")
-        results_dialog.set_modal(True)
-        results_dialog.set_transient_for(self)
-
-        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
-        box.set_margin_start(10)
-        box.set_margin_end(10)
-        box.set_margin_top(10)
-        box.set_margin_bottom(10)
+        results_dialog, box = self._make_modal(f"Search Results: {query}", 600, 400, margin=10)
 
         # Scrollable results
         scroll = Gtk.ScrolledWindow()
@@ -610,9 +764,9 @@ class SettingsDialog(Adw.PreferencesWindow):
         results_list = Gtk.ListBox()
         results_list.set_selection_mode(Gtk.SelectionMode.NONE)
 
-        for memory in memories:
-            row = self._create_memory_row(memory)
-            results_list.append(row)
+        # First rows now; the rest are added after the dialog is shown
+        pending = iter(memories)
+        more = self._append_memory_rows(results_list, pending)
 
         scroll.set_child(results_list)
         box.append(scroll)
@@ -623,23 +777,15 @@ class SettingsDialog(Adw.PreferencesWindow):
         close_button.set_halign(Gtk.Align.END)
         box.append(close_button)
 
-        results_dialog.set_content(box)
         results_dialog.present()
 
+        if more:
+            GLib.idle_add(self._append_memory_rows_idle, results_list, pending)
+
     def _on_add_memory(self, button):
         """Handle add memory manually."""
-        dialog = Adw.Window()
-        dialog.set_default_size(500, 600)
-        dialog.set_title("Add Memory")
-        dialog.set_modal(True)
-        dialog.set_transient_for(self)
-
         # Main box with scroll
-        main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
-        main_box.set_margin_start(20)
-        main_box.set_margin_end(20)
-        main_box.set_margin_top(20)
-        main_box.set_margin_bottom(20)
+        dialog, main_box = self._make_modal("Add Memory", 500, 600)
 
         scroll = Gtk.ScrolledWindow()
         scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
@@ -721,7 +867,6 @@ class SettingsDialog(Adw.PreferencesWindow):
         button_box.append(add_button)
 
         main_box.append(button_box)
-        dialog.set_content(main_box)
         dialog.present()
 
     def _on_confirm_add_memory(self, button, dialog, type_row, content_row, key_row,
@@ -754,26 +899,12 @@ class SettingsDialog(Adw.PreferencesWindow):
 
     def _on_export_memories(self, button):
         """Handle export memories."""
-        dialog = Adw.Window()
-        dialog.set_default_size(500, 300)
-        dialog.set_title("Export Memories")
-        dialog.set_modal(True)
-        dialog.set_transient_for(self)
-
-        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
-        box.set_margin_start(20)
-        box.set_margin_end(20)
-        box.set_margin_top(20)
-        box.set_margin_bottom(20)
+        dialog, box = self._make_modal("Export Memories", 500, 300)
 
         # Format selection
-        format_list = Gtk.StringList()
-        format_list.append("JSON")
-        format_list.append("Readable Text")
-
         format_row = Adw.ComboRow()
         format_row.set_title("Export Format")
-        format_row.set_model(format_list)
+        format_row.set_model(Gtk.StringList.new(EXPORT_FORMAT_NAMES))
         format_row.set_selected(0)
         box.append(format_row)
 
@@ -809,25 +940,33 @@ class SettingsDialog(Adw.PreferencesWindow):
         button_box.append(export_button)
 
         box.append(button_box)
-        dialog.set_content(box)
         dialog.present()
 
     def _on_confirm_export(self, button, dialog, format_row, file_row):
         """Handle confirm export."""
-        # Get format
-        format_index = format_row.get_selected()
-        format_item = format_row.get_model().get_string(format_index)
-        export_format = "json" if "JSON" in format_item else "txt"
+        export_format = EXPORT_FORMATS[format_row.get_selected()]
 
         # Get filepath
         filepath = file_row.get_text().strip()
-        if not filepath.endswith(f".{export_format}"):
-            filepath = filepath.rsplit(".", 1)[0] if "." in filepath else filepath
-            filepath += f".{export_format}"
+        root, ext = os.path.splitext(filepath)
+        if ext != f".{export_format}":
+            filepath = f"{root}.{export_format}"
+
+        # Export off the main loop; the dialog stays open until it finishes
+        button.set_sensitive(False)
+        thread = threading.Thread(
+            target=self._export_in_background, args=(filepath, export_format, dialog, button)
+        )
+        thread.start()
 
-        # Export
+    def _export_in_background(self, filepath, export_format, dialog, button):
+        """Write the export file, then report back on the main loop."""
         result = self.app.memory_store.export_memories(filepath, export_format)
+        GLib.idle_add(self._show_export_result, result, dialog, button)
 
+    def _show_export_result(self, result, dialog, button):
+        """Show the outcome of an export."""
+        button.set_sensitive(True)
         if result["success"]:
             # Show success toast/dialog
             success_dialog = Adw.MessageDialog()
@@ -850,231 +989,129 @@ class SettingsDialog(Adw.PreferencesWindow):
 
     def _on_import_memories(self, button):
         """Handle import memories."""
-        # File chooser dialog (using GTK3 blocking dialog for file selection)
-        file_chooser = Gtk.FileChooserDialog(
-            title="Import Memories",
-            transient_for=self,
-            action=Gtk.FileChooserAction.OPEN,
-        )
-        file_chooser.add_button("Cancel", Gtk.ResponseType.CANCEL)
-        file_chooser.add_button("Import", Gtk.ResponseType.OK)
+        file_dialog = Gtk.FileDialog(title="Import Memories")
 
         # Filter for JSON files
         json_filter = Gtk.FileFilter()
         json_filter.set_name("JSON Files (*.json)")
         json_filter.add_pattern("*.json")
-        file_chooser.add_filter(json_filter)
 
         # All files filter
         all_filter = Gtk.FileFilter()
         all_filter.set_name("All Files")
         all_filter.add_pattern("*")
-        file_chooser.add_filter(all_filter)
 
-        response = file_chooser.run()
-        filepath = None
-        if response == Gtk.ResponseType.OK:
-            filepath = file_chooser.get_file().get_path()
+        filters = Gio.ListStore.new(Gtk.FileFilter)
+        filters.append(json_filter)
+        filters.append(all_filter)
+        file_dialog.set_filters(filters)
+        file_dialog.set_default_filter(json_filter)
 
-        file_chooser.destroy()
+        file_dialog.open(self, None, self._on_import_file_chosen)
 
+    def _on_import_file_chosen(self, file_dialog, result):
+        """Ask how to import the chosen file."""
+        try:
+            file = file_dialog.open_finish(result)
+        except GLib.Error:
+            # Dismissed by the user
+            return
+
+        filepath = file.get_path() if file else None
         if not filepath:
             return
 
-        # Ask about merge vs replace using dialog window
-        merge_dialog = Adw.Window()
-        merge_dialog.set_default_size(400, 200)
-        merge_dialog.set_title("Import Memories")
-        merge_dialog.set_modal(True)
+        # Ask about merge vs replace
+        merge_dialog = Adw.MessageDialog()
         merge_dialog.set_transient_for(self)
-
-        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
-        box.set_margin_start(20)
-        box.set_margin_end(20)
-        box.set_margin_top(20)
-        box.set_margin_bottom(20)
-
-        label = Gtk.Label()
-        label.set_markup("<b>Do you want to merge with existing memories or replace all memories?</b>")
-        label.set_wrap(True)
-        box.append(label)
-
-        button_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=5)
-        button_box.set_halign(Gtk.Align.CENTER)
-        button_box.set_margin_top(10)
-
-        cancel_button = Gtk.Button(label="Cancel")
-        cancel_button.connect("clicked", lambda _: merge_dialog.close())
-        button_box.append(cancel_button)
-
-        merge_button = Gtk.Button(label="Merge")
-        merge_button.add_css_class("suggested-action")
-        merge_button.connect("clicked", self._on_import_merge, filepath, merge_dialog)
-        button_box.append(merge_button)
-
-        replace_button = Gtk.Button(label="Replace All")
-        replace_button.add_css_class("destructive-action")
-        replace_button.connect("clicked", self._on_import_replace, filepath, merge_dialog)
-        button_box.append(replace_button)
-
-        box.append(button_box)
-        merge_dialog.set_content(box)
+        merge_dialog.set_heading("Import Memories")
+        merge_dialog.set_body("Do you want to merge with existing memories or replace all memories?")
+        merge_dialog.add_response("cancel", "Cancel")
+        merge_dialog.add_response("merge", "Merge")
+        merge_dialog.add_response("replace", "Replace All")
+        merge_dialog.set_response_appearance("merge", Adw.ResponseAppearance.SUGGESTED)
+        merge_dialog.set_response_appearance("replace", Adw.ResponseAppearance.DESTRUCTIVE)
+        merge_dialog.set_default_response("merge")
+        merge_dialog.set_close_response("cancel")
+        merge_dialog.connect("response", self._on_import_mode_chosen, filepath)
         merge_dialog.present()
 
-    def _on_import_merge(self, button, filepath, dialog):
-        """Handle import with merge."""
-        dialog.close()
-        self._perform_import(filepath, clear_first=False)
-
-    def _on_import_replace(self, button, filepath, dialog):
-        """Handle import with replace."""
-        dialog.close()
-
-        # Confirm replace
-        confirm_dialog = Adw.Window()
-        confirm_dialog.set_default_size(400, 200)
-        confirm_dialog.set_title("Confirm Replace")
-        confirm_dialog.set_modal(True)
-        confirm_dialog.set_transient_for(self)
-
-        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
-        box.set_margin_start(20)
-        box.set_margin_end(20)
-        box.set_margin_top(20)
-        box.set_margin_bottom(20)
-
-        label = Gtk.Label()
-        label.set_markup("<b>This will delete all existing memories before importing.\nThis action cannot be undone.</b>")
-        label.set_wrap(True)
-        box.append(label)
-
-        button_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=5)
-        button_box.set_halign(Gtk.Align.CENTER)
-        button_box.set_margin_top(10)
-
-        cancel_button = Gtk.Button(label="Cancel")
-        cancel_button.connect("clicked", lambda _: confirm_dialog.close())
-        button_box.append(cancel_button)
-
-        confirm_button = Gtk.Button(label="Replace All")
-        confirm_button.add_css_class("destructive-action")
-        confirm_button.connect("clicked", self._on_confirm_replace, filepath, confirm_dialog)
-        button_box.append(confirm_button)
-
-        box.append(button_box)
-        confirm_dialog.set_content(box)
-        confirm_dialog.present()
+    def _on_import_mode_chosen(self, dialog, response, filepath):
+        """Merge right away, or confirm before replacing everything."""
+        if response == "merge":
+            self._perform_import(filepath, clear_first=False)
+        elif response == "replace":
+            self._make_confirm(
+                "Replace All Memories?",
+                "This will delete all existing memories before importing.\nThis action cannot be undone.",
+                "Replace All",
+                lambda: self._perform_import(filepath, clear_first=True),
+            )
 
-    def _on_confirm_replace(self, button, filepath, dialog):
-        """Handle confirm replace."""
-        dialog.close()
-        self._perform_import(filepath, clear_first=True)
+    def _set_memory_actions_sensitive(self, sensitive):
+        """Enable or disable the memory page's refresh, import and clear buttons."""
+        for button in self._memory_action_buttons:
+            button.set_sensitive(sensitive)
 
     def _perform_import(self, filepath, clear_first):
         """Perform the actual import."""
-        # Clear existing if needed
-        if clear_first:
-            memories = self.app.memory_store.get_all_memories()
-            for memory in memories:
-                self.app.memory_store.delete_memory(memory.id)
-
-        # Import
-        result = self.app.memory_store.import_memories(filepath, merge=True)
-
-        # Show result dialog
-        result_dialog = Adw.Window()
-        result_dialog.set_default_size(400, 200)
-        result_dialog.set_title("Import Result" if result["success"] else "Import Failed")
-        result_dialog.set_modal(True)
+        self._set_memory_actions_sensitive(False)
+        thread = threading.Thread(target=self._import_in_background, args=(filepath, clear_first))
+        thread.start()
+
+    def _import_in_background(self, filepath, clear_first):
+        """Read and merge the import file, then report back on the main loop."""
+        # Replace mode clears the store inside the same save as the import
+        result = self.app.memory_store.import_memories(filepath, merge=not clear_first)
+        GLib.idle_add(self._show_import_result, result)
+
+    def _show_import_result(self, result):
+        """Show the outcome of an import."""
+        self._set_memory_actions_sensitive(True)
+        result_dialog = Adw.MessageDialog()
         result_dialog.set_transient_for(self)
 
-        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
-        box.set_margin_start(20)
-        box.set_margin_end(20)
-        box.set_margin_top(20)
-        box.set_margin_bottom(20)
-
         if result["success"]:
-            heading = Gtk.Label()
-            heading.set_markup("<b>Import Complete!</b>")
-            box.append(heading)
-
             summary = f"Added: {result['added']} memories\nUpdated: {result['updated']} memories"
             if result.get('skipped', 0) > 0:
                 summary += f"\nSkipped: {result['skipped']} memories"
 
-            label = Gtk.Label(label=summary)
-            box.append(label)
+            result_dialog.set_heading("Import Complete!")
+            result_dialog.set_body(summary)
         else:
-            heading = Gtk.Label()
-            heading.set_markup(f"<b>Import Failed</b>")
-            box.append(heading)
-
-            label = Gtk.Label(label=result.get("error", "Unknown error"))
-            label.set_wrap(True)
-            box.append(label)
-
-        close_button = Gtk.Button(label="Close")
-        close_button.connect("clicked", self._on_import_close)
-        close_button.set_halign(Gtk.Align.END)
-        close_button.set_margin_top(10)
-        box.append(close_button)
+            result_dialog.set_heading("Import Failed")
+            result_dialog.set_body(result.get("error", "Unknown error"))
 
-        result_dialog.set_content(box)
+        result_dialog.add_response("close", "Close")
+        result_dialog.connect("response", self._on_import_close)
         result_dialog.present()
 
-    def _on_import_close(self, button):
-        """Close import result dialog and refresh."""
-        # Find and close the dialog
-        dialog = button.get_ancestor(Adw.Window)
-        if dialog:
-            dialog.close()
-        self._on_refresh_memories(None)
+    def _on_import_close(self, dialog, response):
+        """Refresh the list once the import result is dismissed."""
+        # Let the dialog finish closing before rebuilding the list
+        GLib.idle_add(self._on_refresh_memories, None, priority=GLib.PRIORITY_LOW)
 
     def _on_clear_memories(self, button):
         """Handle clear all memories."""
-        # Confirm dialog
-        confirm_dialog = Adw.Window()
-        confirm_dialog.set_default_size(400, 200)
-        confirm_dialog.set_title("Confirm Clear")
-        confirm_dialog.set_modal(True)
-        confirm_dialog.set_transient_for(self)
-
-        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
-        box.set_margin_start(20)
-        box.set_margin_end(20)
-        box.set_margin_top(20)
-        box.set_margin_bottom(20)
-
-        label = Gtk.Label()
-        label.set_markup("<b>This will delete all stored memories.\nYour AI companion will forget everything about you.</b>")
-        label.set_wrap(True)
-        box.append(label)
-
-        button_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=5)
-        button_box.set_halign(Gtk.Align.CENTER)
-        button_box.set_margin_top(10)
-
-        cancel_button = Gtk.Button(label="Cancel")
-        cancel_button.connect("clicked", lambda _: confirm_dialog.close())
-        button_box.append(cancel_button)
-
-        clear_button = Gtk.Button(label="Clear All")
-        clear_button.add_css_class("destructive-action")
-        clear_button.connect("clicked", self._on_confirm_clear, confirm_dialog)
-        button_box.append(clear_button)
-
-        box.append(button_box)
-        confirm_dialog.set_content(box)
-        confirm_dialog.present()
+        self._make_confirm(
+            "Clear All Memories?",
+            "This will delete all stored memories.\nYour AI companion will forget everything about you.",
+            "Clear All",
+            self._clear_memories,
+        )
 
-    def _on_confirm_clear(self, button, dialog):
-        """Handle confirm clear memories."""
-        dialog.close()
+    def _clear_memories(self):
+        """Clear all memories on a worker thread."""
+        self._set_memory_actions_sensitive(False)
+        thread = threading.Thread(target=self._clear_in_background)
+        thread.start()
 
-        # Delete all memories
-        memories = self.app.memory_store.get_all_memories()
-        for memory in memories:
-            self.app.memory_store.delete_memory(memory.id)
+    def _clear_in_background(self):
+        """Clear the store, then refresh the list on the main loop."""
+        self.app.memory_store.clear_all()
+        GLib.idle_add(self._on_clear_finished)
 
+    def _on_clear_finished(self):
+        """Re-enable the memory actions and show the emptied list."""
+        self._set_memory_actions_sensitive(True)
         self._on_refresh_memories(None)
@@ -13,6 +13,15 @@ gi.require_version("Adw", "1")
 from gi.repository import Gtk, Adw
 
 
+# Shared fields of every memory saved from the profile
+_PROFILE_BASE = {"companion_id": "user_profile", "is_shared": True}
+
+
+def _slug(text):
+    """Turn a list item into the suffix of its memory key."""
+    return text.lower().replace(" ", "_")
+
+
 class UserProfileDialog(Adw.PreferencesWindow):
     """Dialog for editing user profile (GTK4)."""
 
@@ -119,8 +128,6 @@ class UserProfileDialog(Adw.PreferencesWindow):
 
     def _load_profile(self):
         """Load existing user profile from memories."""
-        memories = self.app.memory_store.get_all_memories()
-
         # Map memory keys to entry fields
         field_map = {
             "name": self.name_entry,
@@ -128,175 +135,183 @@ class UserProfileDialog(Adw.PreferencesWindow):
             "gender": self.gender_entry,
             "occupation": self.occupation_entry,
         }
-
-        for memory in memories:
-            if memory.key and memory.key in field_map:
-                field_map[memory.key].set_text(memory.value or "")
-            elif memory.memory_type == "preference":
-                if "love" in memory.content.lower() or "likes" in memory.content.lower():
-                    current = self.likes_entry.get_text()
-                    if memory.value:
-                        self.likes_entry.set_text(f"{current}, {memory.value}" if current else memory.value)
-                elif "hate" in memory.content.lower() or "dislikes" in memory.content.lower():
-                    current = self.dislikes_entry.get_text()
-                    if memory.value:
-                        self.dislikes_entry.set_text(f"{current}, {memory.value}" if current else memory.value)
+        for key, memory in self.app.memory_store.get_memories_by_keys(list(field_map)).items():
+            field_map[key].set_text(memory.value or "")
+
+        # Collect list fields first and set each entry once at the end
+        likes = []
+        dislikes = []
+        interests = []
+        goals = []
+
+        for memory in self.app.memory_store.get_all_memories():
+            if memory.key in field_map:
+                continue
+            if memory.memory_type == "preference":
+                if not memory.value:
+                    continue
+                content = memory.content.lower()
+                if "love" in content or "likes" in content:
+                    likes.append(memory.value)
+                elif "hate" in content or "dislikes" in content:
+                    dislikes.append(memory.value)
             elif memory.memory_type == "interest":
-                interests = self.interests_entry.get_text()
                 if memory.value:
-                    self.interests_entry.set_text(f"{interests}, {memory.value}" if interests else memory.value)
+                    interests.append(memory.value)
             elif memory.memory_type == "goal":
-                goals = self.goals_entry.get_text()
                 if memory.content:
-                    self.goals_entry.set_text(f"{goals}, {memory.content}" if goals else memory.content)
+                    goals.append(memory.content)
+
+        for entry, parts in (
+            (self.likes_entry, likes),
+            (self.dislikes_entry, dislikes),
+            (self.interests_entry, interests),
+            (self.goals_entry, goals),
+        ):
+            if parts:
+                entry.set_text(", ".join(parts))
 
     def _on_save_clicked(self, button):
         """Handle save button click."""
         saved_count = self._save_profile()
 
-        # Show toast notification (will be shown by parent window)
+        # Show toast notification in the parent window
+        parent = self.get_transient_for()
+        if parent is not None and saved_count:
+            toast = Adw.Toast(title=f"Saved {saved_count} profile details")
+            parent.toast_overlay.add_toast(toast)
         self.close()
 
     def _save_profile(self):
         """Save user profile as memories."""
-        import uuid
-
-        saved_count = 0
+        name = self.name_entry.get_text().strip()
+        birthday = self.birthday_entry.get_text().strip()
+        location = self.location_entry.get_text().strip()
+        gender = self.gender_entry.get_text().strip()
+        occupation = self.occupation_entry.get_text().strip()
+        interests = self.interests_entry.get_text().strip()
+        likes = self.likes_entry.get_text().strip()
+        dislikes = self.dislikes_entry.get_text().strip()
+        goals = self.goals_entry.get_text().strip()
+        notes = self.notes_entry.get_text().strip()
+
+        rows = []
 
         # Save basic info
-        if self.name_entry.get_text().strip():
-            self.app.memory_store.add_memory(
+        if name:
+            rows.append(dict(
+                _PROFILE_BASE,
                 memory_type="personal_info",
-                content=f"User's name is {self.name_entry.get_text().strip()}",
+                content=f"User's name is {name}",
                 key="name",
-                value=self.name_entry.get_text().strip(),
+                value=name,
                 importance=5,
-                companion_id="user_profile",
-                is_shared=True,
-            )
-            saved_count += 1
+            ))
 
-        if self.birthday_entry.get_text().strip():
-            self.app.memory_store.add_memory(
+        if birthday:
+            rows.append(dict(
+                _PROFILE_BASE,
                 memory_type="personal_info",
-                content=f"User's birthday is {self.birthday_entry.get_text().strip()}",
+                content=f"User's birthday is {birthday}",
                 key="birthday",
-                value=self.birthday_entry.get_text().strip(),
+                value=birthday,
                 importance=5,
-                companion_id="user_profile",
-                is_shared=True,
-            )
-            saved_count += 1
+            ))
 
-        if self.location_entry.get_text().strip():
-            self.app.memory_store.add_memory(
+        if location:
+            rows.append(dict(
+                _PROFILE_BASE,
                 memory_type="personal_info",
-                content=f"User lives in {self.location_entry.get_text().strip()}",
+                content=f"User lives in {location}",
                 key="location",
-                value=self.location_entry.get_text().strip(),
+                value=location,
                 importance=4,
-                companion_id="user_profile",
-                is_shared=True,
-            )
-            saved_count += 1
+            ))
 
-        if self.gender_entry.get_text().strip():
-            self.app.memory_store.add_memory(
+        if gender:
+            rows.append(dict(
+                _PROFILE_BASE,
                 memory_type="personal_info",
-                content=f"User identifies as: {self.gender_entry.get_text().strip()}",
+                content=f"User identifies as: {gender}",
                 key="gender",
-                value=self.gender_entry.get_text().strip(),
+                value=gender,
                 importance=4,
-                companion_id="user_profile",
-                is_shared=True,
-            )
-            saved_count += 1
+            ))
 
-        if self.occupation_entry.get_text().strip():
-            self.app.memory_store.add_memory(
+        if occupation:
+            rows.append(dict(
+                _PROFILE_BASE,
                 memory_type="personal_info",
-                content=f"User works as: {self.occupation_entry.get_text().strip()}",
+                content=f"User works as: {occupation}",
                 key="occupation",
-                value=self.occupation_entry.get_text().strip(),
+                value=occupation,
                 importance=3,
-                companion_id="user_profile",
-                is_shared=True,
-            )
-            saved_count += 1
+            ))
 
         # Save interests
-        if self.interests_entry.get_text().strip():
-            interests = [i.strip() for i in self.interests_entry.get_text().split(",")]
+        if interests:
+            interests = [i.strip() for i in interests.split(",")]
             for interest in interests[:10]:
                 if interest:
-                    self.app.memory_store.add_memory(
+                    rows.append(dict(
+                        _PROFILE_BASE,
                         memory_type="interest",
                         content=f"User is interested in {interest}",
-                        key=f"interest_{interest.lower().replace(' ', '_')}",
+                        key=f"interest_{_slug(interest)}",
                         value=interest,
                         importance=3,
-                        companion_id="user_profile",
-                        is_shared=True,
-                    )
-                    saved_count += 1
+                    ))
 
         # Save likes
-        if self.likes_entry.get_text().strip():
-            likes = [i.strip() for i in self.likes_entry.get_text().split(",")]
+        if likes:
+            likes = [i.strip() for i in likes.split(",")]
             for like in likes[:10]:
                 if like:
-                    self.app.memory_store.add_memory(
+                    rows.append(dict(
+                        _PROFILE_BASE,
                         memory_type="preference",
                         content=f"User likes {like}",
-                        key=f"likes_{like.lower().replace(' ', '_')}",
+                        key=f"likes_{_slug(like)}",
                         value=like,
                         importance=3,
-                        companion_id="user_profile",
-                        is_shared=True,
-                    )
-                    saved_count += 1
+                    ))
 
         # Save dislikes
-        if self.dislikes_entry.get_text().strip():
-            dislikes = [i.strip() for i in self.dislikes_entry.get_text().split(",")]
+        if dislikes:
+            dislikes = [i.strip() for i in dislikes.split(",")]
             for dislike in dislikes[:10]:
                 if dislike:
-                    self.app.memory_store.add_memory(
+                    rows.append(dict(
+                        _PROFILE_BASE,
                         memory_type="preference",
                         content=f"User dislikes {dislike}",
-                        key=f"dislikes_{dislike.lower().replace(' ', '_')}",
+                        key=f"dislikes_{_slug(dislike)}",
                         value=dislike,
                         importance=3,
-                        companion_id="user_profile",
-                        is_shared=True,
-                    )
-                    saved_count += 1
+                    ))
 
         # Save goals
-        if self.goals_entry.get_text().strip():
-            goals = [g.strip() for g in self.goals_entry.get_text().split(",")]
+        if goals:
+            goals = [g.strip() for g in goals.split(",")]
             for goal in goals[:5]:
                 if goal:
-                    self.app.memory_store.add_memory(
+                    rows.append(dict(
+                        _PROFILE_BASE,
                         memory_type="goal",
                         content=f"User's goal: {goal}",
-                        key=f"goal_{goal.lower().replace(' ', '_')}",
+                        key=f"goal_{_slug(goal)}",
                         value=goal,
                         importance=4,
-                        companion_id="user_profile",
-                        is_shared=True,
-                    )
-                    saved_count += 1
+                    ))
 
         # Save notes
-        if self.notes_entry.get_text().strip():
-            self.app.memory_store.add_memory(
+        if notes:
+            rows.append(dict(
+                _PROFILE_BASE,
                 memory_type="important_fact",
-                content=f"About the user: {self.notes_entry.get_text().strip()}",
+                content=f"About the user: {notes}",
                 importance=3,
-                companion_id="user_profile",
-                is_shared=True,
-            )
-            saved_count += 1
+            ))
 
-        return saved_count
+        self.app.memory_store.add_memories_bulk(rows)
+        return len(rows)